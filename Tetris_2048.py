@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 
 # ─── BACKGROUND MUSIC via afplay (stops on Game Over) ────────────────────────
-import threading, subprocess, time
+import threading, subprocess, time, shutil
+_T0 = time.perf_counter()    # for --startup-benchmark
 
 stop_bgm = threading.Event()
 _bgmp = None
@@ -20,194 +21,355 @@ def _play_bgm_loop(filename: str):
     if _bgmp and _bgmp.poll() is None:
         _bgmp.terminate()
 
-threading.Thread(
-    target=_play_bgm_loop,
-    args=('bgm.wav',),
-    daemon=True
-).start()
+def start_bgm():
+    # bgm.wav is optional, and so is afplay (macOS only)
+    filename = resource_path('bgm.wav')
+    stop_bgm.clear()
+    if os.path.exists(filename) and shutil.which('afplay'):
+        threading.Thread(
+            target=_play_bgm_loop,
+            args=(filename,),
+            daemon=True
+        ).start()
 
 
 # ─── IMPORTS & ACHIEVEMENTS ──────────────────────────────────────────────────
 import stddraw
-import random, os
+import argparse, random, os
+import game_config
 from game_grid    import GameGrid
+from board_index  import default_index
 from tetromino    import Tetromino
 from picture      import Picture
 from color        import Color
 from achievements import AchievementManager
+from game_config  import GameConfig
+from levels       import LevelProgress, Scheduler
+from game_history import HistoryStore
+from perf_hud     import PerfHUD
+from frame_capture import FrameRecorder
+from resources    import resource_path
 
 ach_mgr = AchievementManager()
 
 
 # ─── HELPERS ─────────────────────────────────────────────────────────────────
-def rowsToCheck(tiles):
-    s = set()
-    for col in tiles:
+def create_tetromino(config):
+    return Tetromino(random.choice(config.pieces), config.grid_h, config.grid_w,
+                     values=config.spawn_values)
+
+def save_result(grid, lines, duration_s, seed, replay=None, path=None):
+    """Add a finished human game, and its recording if any, to the history."""
+    top = int(grid.values.max())
+    with HistoryStore(path) as history:
+        history.record(grid.score, 1 << top if top else 0, lines,
+                       duration_s=duration_s, seed=seed, replay=replay,
+                       player='human')
+
+
+# ─── TIMING ─────────────────────────────────────────────────────────────────
+CELL_PX  = 40      # logical size of a board cell, before the HiDPI scale
+FRAME_MS = 16      # input is drained and the frame redrawn at this tick
+DAS_MS   = 170     # delayed auto shift for held keys
+ARR_MS   = 50      # auto repeat rate once DAS has elapsed
+MAX_LOCK_RESETS = 15   # moves that may restart the lock delay per piece
+HUD_KEYS = ('f3', 'h')  # toggle the performance overlay
+GAME_OVER_MS = 5000     # kiosk mode: game over screen before the menu
+
+
+# ─── COLORS ─────────────────────────────────────────────────────────────────
+bg    = Color(42,69,99)
+btn   = Color(25,255,228)
+txt   = Color(31,160,239)
+sb_bg = Color(205,193,180)
+sb_tx = Color(119,110,101)
+ghost = Color(150,150,150)
+
+
+# ─── DRAWING ────────────────────────────────────────────────────────────────
+def draw_frame(grid, current, next_piece, extra_cols):
+    grid_h, grid_w = grid.grid_height, grid.grid_width
+    stddraw.clear(bg)
+    grid.draw_grid()
+
+    # ── GHOST PIECE ─────────────────────
+    # column heights are computed from the values (O(w*h) in numpy, no
+    # caching: the board changes with every lock); cells tucked under an
+    # overhang fall back to scanning down
+    heights  = grid.column_heights()
+    min_drop = grid.grid_height
+    for col in current.tile_matrix:
         for t in col:
-            if t: s.add(t.position.y)
-    return s
-
-def columnsToCheck(tiles):
-    s = set()
-    for col in tiles:
+            if t:
+                x,y = t.position.x, t.position.y; d=0
+                if y >= heights[x]:
+                    d = y - heights[x]
+                else:
+                    while grid.is_inside(y-d-1,x) and not grid.is_occupied(y-d-1,x):
+                        d+=1
+                min_drop = min(min_drop,d)
+    stddraw.setPenColor(ghost)
+    cells = [t.position for col in current.tile_matrix for t in col if t]
+    stddraw.filledSquares([p.x for p in cells],
+                          [p.y-min_drop for p in cells], 0.5)
+
+    # ACTUAL PIECE
+    current.draw()
+    grid.draw_boundaries()
+
+    # ── SIDEBAR: Next preview ─────────────
+    preview_x, preview_y = grid_w+2, grid_h/2+5
+    hw, hh = 1.5, 1.5
+    # background box
+    stddraw.setPenColor(sb_bg)
+    stddraw.filledRectangle(preview_x, preview_y, hw, hh)
+    # border
+    stddraw.setPenColor(sb_tx); stddraw.setPenRadius(2)
+    stddraw.rectangle(preview_x, preview_y, hw, hh)
+    stddraw.setPenRadius()
+    # label
+    stddraw.setFontFamily('Arial'); stddraw.setFontSize(14)
+    stddraw.text(preview_x, preview_y-hh-1, 'Next')
+
+    # draw next piece inside box
+    dx = preview_x - (grid_w-1)/2
+    dy = preview_y - (grid_h-1)/2
+    for col in next_piece.tile_matrix:
         for t in col:
-            if t: s.add(t.position.x)
-    return s
-
-def create_tetromino(h, w):
-    return Tetromino(random.choice(['I','O','Z']), h, w)
-
-
-# ─── MAIN ───────────────────────────────────────────────────────────────────
-def start():
-    grid_h, grid_w = 20, 12
-    extra_cols     = 4
-    canvas_h       = 40 * grid_h
-    canvas_w       = 40 * (grid_w + extra_cols)
-
-    stddraw.setCanvasSize(canvas_w, canvas_h)
-    stddraw.setXscale(-0.5, grid_w + extra_cols - 0.5)
-    stddraw.setYscale(-0.5, grid_h - 0.5)
-
-    # Colors
-    bg    = Color(42,69,99)
-    btn   = Color(25,255,228)
-    txt   = Color(31,160,239)
-    sb_bg = Color(205,193,180)
-    sb_tx = Color(119,110,101)
-    ghost = Color(150,150,150)
-
-    # 1) MENU SCREEN
+            if t:
+                tx, ty = t.position.x + dx, t.position.y + dy
+                stddraw.setPenColor(t.background_color)
+                stddraw.filledSquare(tx, ty, 0.5)
+                stddraw.setPenColor(t.boundary_color)
+                stddraw.square(tx, ty, 0.5)
+                stddraw.setFontFamily('Arial'); stddraw.setFontSize(16)
+                stddraw.setPenColor(t.foreground_color)
+                stddraw.boldText(tx, ty, str(t.number))
+
+    # ── SCOREBOARD ────────────────────────
+    stddraw.setFontSize(18)
+    stddraw.setPenColor(Color(255,255,255))
+    stddraw.text(grid_w+1, grid_h-2, f'Next: {next_piece.type}')
+    sx = grid_w + extra_cols/2
+    stddraw.setPenColor(sb_bg)
+    stddraw.filledRectangle(sx, grid_h/2, extra_cols/2-0.5, grid_h/2)
+    stddraw.setPenColor(sb_tx)
+    stddraw.setFontSize(16)
+    stddraw.text(sx, grid_h/2+2, 'Score')
+    stddraw.setFontSize(22)
+    stddraw.text(sx, grid_h/2-1, str(grid.score))
+
+
+# ─── SCREENS ────────────────────────────────────────────────────────────────
+def draw_menu(grid_h, grid_w):
+    """Draw the start screen; returns the button as (x, y, w, h)."""
     stddraw.clear(bg)
-    pic = Picture(os.path.join(os.path.dirname(__file__),'menu_image.png'))
+    pic = Picture(resource_path('menu_image.png'))
     stddraw.picture(pic, (grid_w-1)/2, grid_h-7)
     bx,by,bw,bh = (grid_w-1)/2,3.5,8,3
     stddraw.setPenColor(btn)
     stddraw.filledRectangle(bx,by,bw/2,bh/2)
     stddraw.setFontFamily('Arial'); stddraw.setFontSize(25)
     stddraw.setPenColor(txt); stddraw.text(bx,by,'Click Here to Start')
+    return bx,by,bw,bh
+
+def wait_for_start(button):
+    bx,by,bw,bh = button
     while True:
         stddraw.show(50)
         if stddraw.mousePressed():
             mx,my = stddraw.mouseX(), stddraw.mouseY()
             if bx-bw/2<=mx<=bx+bw/2 and by-bh/2<=my<=by+bh/2:
-                break
+                return
+
+def draw_game_over(grid):
+    grid_h, grid_w = grid.grid_height, grid.grid_width
+    stddraw.clear(bg)
+    stddraw.setFontSize(40)
+    stddraw.setPenColor(Color(255,255,255))
+    stddraw.text((grid_w-1)/2, grid_h/2, 'Game Over')
+    stddraw.setFontSize(24)
+    stddraw.text((grid_w-1)/2, grid_h/2-2, f'Score: {grid.score}')
+
 
-    # 2) GAME LOOP
-    grid       = GameGrid(grid_h, grid_w)
-    game_over  = False
-    current    = create_tetromino(grid_h, grid_w)
-    next_piece = create_tetromino(grid_h, grid_w)
+# ─── GAME ───────────────────────────────────────────────────────────────────
+def play_game(config, perf, record=None):
+    """Play one game until it is over; returns the final grid."""
+    grid_h, grid_w = config.grid_h, config.grid_w
+    extra_cols     = config.extra_cols
+    stddraw.setKeyRepeat(DAS_MS, ARR_MS, ('left','right'))
+    stddraw.clearKeysTyped()
+    seed        = random.randrange(2**32)   # recorded with the result
+    random.seed(seed)
+    started     = time.monotonic()
+    grid        = GameGrid(grid_h, grid_w)
+    game_over   = False
+    progress    = LevelProgress(config)
+    frame_clock = Scheduler(FRAME_MS/1000)
+    # recording: every redrawn frame goes to a background encoder
+    recorder    = FrameRecorder(record, grid_h, grid_w) if record else None
+    current     = create_tetromino(config)
+    next_piece  = create_tetromino(config)
+    # the overlay is a retained item: only on screen while a game runs
+    perf.resume()
 
     while not game_over:
         grid.current_tetromino = current
 
-        # DROP LOOP
+        # DROP LOOP: every tick drains all pending keys and applies every
+        # gravity step that is due, then redraws once if anything changed
+        level      = progress.timings
+        gravity    = Scheduler(level.gravity_ms/1000)
+        lock_since = None
+        resets     = 0
+        dirty      = True
         while True:
-            if stddraw.hasNextKeyTyped():
-                k = stddraw.nextKeyTyped()
-                if k in ('left','right','down','up','space'):
-                    current.move(k, grid)
-
-            stddraw.clear(bg)
-            grid.draw_grid()
-
-            # ── GHOST PIECE ─────────────────────
-            min_drop = grid.grid_height
-            for col in current.tile_matrix:
-                for t in col:
-                    if t:
-                        x,y = t.position.x, t.position.y; d=0
-                        while True:
-                            if not grid.is_inside(y-d-1,x) or grid.is_occupied(y-d-1,x):
-                                break
-                            d+=1
-                        min_drop = min(min_drop,d)
-            stddraw.setPenColor(ghost)
-            for col in current.tile_matrix:
-                for t in col:
-                    if t:
-                        x,y = t.position.x, t.position.y
-                        stddraw.filledSquare(x, y-min_drop, 0.5)
-
-            # ACTUAL PIECE
-            current.draw()
-            grid.draw_boundaries()
-
-            # ── SIDEBAR: Next preview ─────────────
-            preview_x, preview_y = grid_w+2, grid_h/2+5
-            hw, hh = 1.5, 1.5
-            # background box
-            stddraw.setPenColor(sb_bg)
-            stddraw.filledRectangle(preview_x, preview_y, hw, hh)
-            # border
-            stddraw.setPenColor(sb_tx); stddraw.setPenRadius(2)
-            stddraw.rectangle(preview_x, preview_y, hw, hh)
-            stddraw.setPenRadius()
-            # label
-            stddraw.setFontFamily('Arial'); stddraw.setFontSize(14)
-            stddraw.text(preview_x, preview_y-hh-1, 'Next')
-
-            # draw next piece inside box
-            dx = preview_x - (grid_w-1)/2
-            dy = preview_y - (grid_h-1)/2
-            for col in next_piece.tile_matrix:
-                for t in col:
-                    if t:
-                        tx, ty = t.position.x + dx, t.position.y + dy
-                        stddraw.setPenColor(t.background_color)
-                        stddraw.filledSquare(tx, ty, 0.5)
-                        stddraw.setPenColor(t.boundary_color)
-                        stddraw.square(tx, ty, 0.5)
-                        stddraw.setFontFamily('Arial'); stddraw.setFontSize(16)
-                        stddraw.setPenColor(t.foreground_color)
-                        stddraw.boldText(tx, ty, str(t.number))
-
-            # ── SCOREBOARD ────────────────────────
-            stddraw.setFontSize(18)
-            stddraw.setPenColor(Color(255,255,255))
-            stddraw.text(grid_w+1, grid_h-2, f'Next: {next_piece.type}')
-            sx = grid_w + extra_cols/2
-            stddraw.setPenColor(sb_bg)
-            stddraw.filledRectangle(sx, grid_h/2, extra_cols/2-0.5, grid_h/2)
-            stddraw.setPenColor(sb_tx)
-            stddraw.setFontSize(16)
-            stddraw.text(sx, grid_h/2+2, 'Score')
-            stddraw.setFontSize(22)
-            stddraw.text(sx, grid_h/2-1, str(grid.score))
-
-            stddraw.show(300)
-            if not current.move('down', grid):
+            tick = time.perf_counter()
+            for k, _ in stddraw.drainKeys():
+                if k in HUD_KEYS:
+                    perf.toggle()
+                elif k in ('left','right','down','up','space'):
+                    moved = current.rotateTetromino(grid) if k == 'up' \
+                        else current.move(k, grid)
+                    if moved:
+                        dirty = True
+                        if lock_since is not None and resets < MAX_LOCK_RESETS:
+                            lock_since, resets = None, resets + 1
+
+            # soft drop while 'down' is held
+            soft = stddraw.isKeyHeld('down')
+            gravity.set_interval(
+                (level.soft_drop_ms if soft else level.gravity_ms)/1000)
+            for _ in range(gravity.due()):
+                if not current.move('down', grid):
+                    if lock_since is None:
+                        lock_since = time.monotonic()
+                    break
+                lock_since = None
+                dirty = True
+            if lock_since is not None and \
+                    time.monotonic() - lock_since >= level.lock_delay_ms/1000:
                 break
 
-        # PLACE & CHECKS
-        tiles     = current.tile_matrix
-        game_over = grid.update_grid(tiles)
+            redrawn = dirty
+            if dirty:
+                draw_frame(grid, current, next_piece, extra_cols)
+                if recorder:
+                    recorder.capture_grid(grid, current)
+                dirty = False
+            perf.update()
+            stddraw.show()
+            if redrawn:
+                perf.frame(time.perf_counter() - tick)
+            frame_clock.sleep()
 
-        rows = rowsToCheck(tiles)
-        grid.rowCheck(rows)
-        if rows:
-            ach_mgr.report_event('row_cleared', len(rows))
-
-        cols = columnsToCheck(tiles)
-        grid.sumCheck(cols, current)
+        # PLACE & CHECKS
+        t_lock = time.perf_counter()
+        game_over, lines, merges = grid.lock_tetromino(
+            current, config.clear_rows, config.merge_tiles,
+            config.merge_mode)
+        perf.lock(time.perf_counter() - t_lock)
+        progress.add(lines, merges)
+        if lines:
+            ach_mgr.report_event('row_cleared', lines)
+        for value in grid.merged_values:
+            ach_mgr.report_event('tile_merged', value)
         ach_mgr.report_event('score_update', grid.score)
 
         if game_over:
             break
 
-        current, next_piece = next_piece, create_tetromino(grid_h, grid_w)
+        current, next_piece = next_piece, create_tetromino(config)
 
     # GAME OVER
+    perf.pause()
     stop_bgm.set()
-    stddraw.clear(bg)
-    stddraw.setFontSize(40)
-    stddraw.setPenColor(Color(255,255,255))
-    stddraw.text((grid_w-1)/2, grid_h/2, 'Game Over')
-    stddraw.setFontSize(24)
-    stddraw.text((grid_w-1)/2, grid_h/2-2, f'Score: {grid.score}')
-    stddraw.show(0)
-    stddraw.mainloop()
+    ach_mgr.game_finished(grid.score)
+    if recorder:
+        recorder.capture_grid(grid)
+        recorder.close()
+        print(f"Recorded {recorder.written} frames to {record} "
+              f"({recorder.dropped} dropped)")
+    save_result(grid, progress.lines, time.monotonic() - started, seed,
+                replay=os.path.abspath(record) if record else None)
+    return grid
+
+
+def between_games():
+    """
+    Kiosk mode, after a game: drop the board index's cached results, which
+    belong to boards of the finished game and would pile up over a session.
+    """
+    default_index.clear()
+
+
+# ─── MAIN ───────────────────────────────────────────────────────────────────
+def start(config=None, scale=None, hud=False, record=None, benchmark=False,
+          kiosk=False):
+    """
+    Menu, game, game over. In kiosk mode this repeats forever: the game
+    over screen returns to the menu after GAME_OVER_MS, the long session
+    mode of stddraw keeps items and images from piling up and
+    between_games() empties the board index.
+    """
+    config         = config or GameConfig()
+    grid_h, grid_w = config.grid_h, config.grid_w
+    extra_cols     = config.extra_cols
+
+    # Layout is in CELL_PX cells; the HiDPI scale maps it to the screen.
+    # scale=None → the board fills 90% of the screen, whatever DPI the
+    # screen reports (X11 usually says 96 even on 4K panels); an explicit
+    # scale is lowered only as far as needed for the board to fit
+    sw, sh = stddraw.screenSize()
+    fit = min(0.9*sh/(grid_h*CELL_PX),
+              0.9*sw/((grid_w+extra_cols)*CELL_PX))
+    stddraw.setHiDPIScale(fit if scale is None else min(scale, fit))
+    stddraw.setCanvasSize(CELL_PX*(grid_w + extra_cols), CELL_PX*grid_h)
+    stddraw.setXscale(-0.5, grid_w + extra_cols - 0.5)
+    stddraw.setYscale(-0.5, grid_h - 0.5)
+    if kiosk:
+        stddraw.setLongSession(True)
+
+    # performance overlay in the free sidebar space under the score
+    perf = PerfHUD(grid_w-0.4, grid_h/2-3, visible=hud)
+    while True:
+        # 1) MENU SCREEN
+        button = draw_menu(grid_h, grid_w)
+        if benchmark:
+            # time to the first complete frame, then exit
+            stddraw.show()
+            print(f"first frame: {(time.perf_counter()-_T0)*1000:.1f} ms "
+                  f"after import")
+            return
+        wait_for_start(button)
+
+        # 2) GAME LOOP
+        start_bgm()
+        grid = play_game(config, perf, record)
+
+        # 3) GAME OVER
+        draw_game_over(grid)
+        if not kiosk:
+            stddraw.show(0)
+            stddraw.mainloop()
+            return
+        between_games()
+        stddraw.show(GAME_OVER_MS)
 
 if __name__ == '__main__':
-    start()
+    parser = argparse.ArgumentParser(description='Tetris 2048')
+    game_config.add_arguments(parser)
+    parser.add_argument('--scale', type=float,
+                        help='HiDPI scale factor (default: fit the screen)')
+    parser.add_argument('--hud', action='store_true',
+                        help='start with the performance overlay (F3/H)')
+    parser.add_argument('--record', metavar='PATH',
+                        help='record the game: .png for an animated PNG, '
+                             'otherwise a folder of PNG frames')
+    parser.add_argument('--startup-benchmark', action='store_true',
+                        help='exit after the first menu frame (see build.py)')
+    parser.add_argument('--kiosk', action='store_true',
+                        help='return to the menu after every game')
+    args = parser.parse_args()
+    start(game_config.from_args(args), args.scale, args.hud, args.record,
+          args.startup_benchmark, args.kiosk)
@@ -1,37 +1,75 @@
 # -*- mode: python ; coding: utf-8 -*-
+#
+# Reproducible PyInstaller build (see build.py). Variants are selected
+# through the environment so one spec serves them all:
+#   TETRIS_BUILD_MODE    onedir (default, fastest cold start) | onefile
+#   TETRIS_BUILD_TARGET  game (default) | simulate | server
+# The headless targets leave out tkinter and Tcl/Tk entirely.
+import os
 
-block_cipher = None
+mode   = os.environ.get('TETRIS_BUILD_MODE', 'onedir')
+target = os.environ.get('TETRIS_BUILD_TARGET', 'game')
 
+entry, name = {
+    'game':     ('Tetris_2048.py',  'Tetris_2048'),
+    'simulate': ('simulate.py',     'tetris2048-simulate'),
+    'server':   ('game_server.py',  'tetris2048-server'),
+}[target]
+headless = target != 'game'
 
-a = Analysis(['Tetris_2048.py'],
-             pathex=['D:\\Phython\\Tetris_2048_Base_Code'],
+# Assets, loaded at run time through resources.resource_path
+datas = []
+if not headless:
+    for asset in ('menu_image.png', 'bgm.wav'):
+        if os.path.exists(os.path.join(SPECPATH, asset)):
+            datas.append((os.path.join(SPECPATH, asset), '.'))
+
+# numpy itself is required by the rules engine; only its build tooling goes
+excludes = ['numpy.f2py', 'numpy.distutils']
+if headless:
+    excludes += ['tkinter', '_tkinter']
+
+
+a = Analysis([os.path.join(SPECPATH, entry)],
+             pathex=[SPECPATH],
              binaries=[],
-             datas=[],
+             datas=datas,
              hiddenimports=[],
              hookspath=[],
              runtime_hooks=[],
-             excludes=[],
-             win_no_prefer_redirects=False,
-             win_private_assemblies=False,
-             cipher=block_cipher,
+             excludes=excludes,
              noarchive=False)
-pyz = PYZ(a.pure, a.zipped_data,
-             cipher=block_cipher)
-exe = EXE(pyz,
-          a.scripts,
-          [],
-          exclude_binaries=True,
-          name='Tetris_2048',
-          debug=False,
-          bootloader_ignore_signals=False,
-          strip=False,
-          upx=True,
-          console=True )
-coll = COLLECT(exe,
-               a.binaries,
-               a.zipfiles,
-               a.datas,
-               strip=False,
-               upx=True,
-               upx_exclude=[],
-               name='Tetris_2048')
+pyz = PYZ(a.pure, a.zipped_data)
+
+if mode == 'onefile':
+    exe = EXE(pyz,
+              a.scripts,
+              a.binaries,
+              a.zipfiles,
+              a.datas,
+              [],
+              name=name,
+              debug=False,
+              bootloader_ignore_signals=False,
+              strip=False,
+              upx=False,
+              runtime_tmpdir=None,
+              console=True)
+else:
+    exe = EXE(pyz,
+              a.scripts,
+              [],
+              exclude_binaries=True,
+              name=name,
+              debug=False,
+              bootloader_ignore_signals=False,
+              strip=False,
+              upx=False,
+              console=True)
+    coll = COLLECT(exe,
+                   a.binaries,
+                   a.zipfiles,
+                   a.datas,
+                   strip=False,
+                   upx=False,
+                   name=name)
@@ -1,10 +1,20 @@
 # achievements.py
 # Achievements definitions embedded directly in Python (no JSON file needed)
-import os
+# Unlocks and lifetime statistics live in a shared StatsStore, so several
+# game processes can report at once without overwriting each other.
+from resources   import data_path
+from stats_store import StatsStore
+
+# Events whose value is compared directly against the threshold; all other
+# events accumulate into a lifetime counter
+DIRECT_EVENTS = ('score_update', 'tile_merged')
+# Lifetime counter that backs each accumulated event
+EVENT_COUNTERS = {'row_cleared': 'rows_cleared'}
 
 class AchievementManager:
     def __init__(self,
-                 save_path=None):
+                 save_path=None,
+                 store=None):
         # Define all achievements inline as Python list of dicts
         self.achdefs = [
             {
@@ -29,51 +39,72 @@ class AchievementManager:
                 'threshold': 1000
             }
         ]
-        # Determine save file path for unlocked achievements
-        base = os.path.dirname(__file__)
-        self.save_path = save_path or os.path.join(base, 'achieved.json')
+        self.store = store or StatsStore()
+        self.unlocked = self.store.unlocked_ids()
 
-        # Load previously unlocked achievements, if any
+        # Import unlocks from the legacy achieved.json, if any (read only)
+        self.save_path = save_path or data_path('achieved.json')
         try:
             with open(self.save_path, 'r', encoding='utf-8') as f:
                 import json
-                self.unlocked = set(json.load(f))
+                legacy = set(json.load(f))
         except Exception:
-            self.unlocked = set()
+            legacy = set()
+        for aid in legacy - self.unlocked:
+            self.store.unlock(aid)
+        self.unlocked |= legacy
 
-        # Progress tracker for non-score events
-        self.progress = {}
+        # Progress of accumulated events starts from the lifetime counters
+        lifetime = self.store.lifetime()
+        self.progress = {event: lifetime.get(name, 0)
+                         for event, name in EVENT_COUNTERS.items()}
 
     def report_event(self, event, value=1):
+        # Lifetime statistics
+        if event == 'row_cleared':
+            self.store.add('rows_cleared', value)
+        elif event == 'tile_merged':
+            self.store.add(f'merges.{value}')
+        elif event == 'score_update':
+            self.store.best('best_score', value)
+        if event not in DIRECT_EVENTS:
+            self.progress[event] = self.progress.get(event, 0) + value
+
         for ach in self.achdefs:
             aid = ach['id']
             if aid in self.unlocked or ach['event'] != event:
                 continue
 
-            if event == 'score_update':
-                # Directly check current score against threshold
+            if event in DIRECT_EVENTS:
+                # Current score / created tile against threshold
                 if value >= ach['threshold']:
                     self._unlock(ach)
-            else:
-                # Accumulate for row_cleared and tile_merged
-                self.progress.setdefault(aid, 0)
-                self.progress[aid] += value
-                if self.progress[aid] >= ach['threshold']:
-                    self._unlock(ach)
+            elif self.progress[event] >= ach['threshold']:
+                self._unlock(ach)
+
+    def game_finished(self, score):
+        """Count a finished game and write all pending statistics."""
+        self.store.add('games')
+        self.store.best('best_score', score)
+        self.store.flush()
+
+    def lifetime(self):
+        """Lifetime statistics merged across every process and worker."""
+        totals = self.store.lifetime()
+        merges = {int(k.split('.', 1)[1]): v for k, v in totals.items()
+                  if k.startswith('merges.')}
+        return {'games': totals.get('games', 0),
+                'rows_cleared': totals.get('rows_cleared', 0),
+                'best_score': totals.get('best_score', 0),
+                'merges': dict(sorted(merges.items()))}
 
     def _unlock(self, ach):
         self.unlocked.add(ach['id'])
         self._notify(ach)
-        self._save()
+        # Unlocks are rare: write them through immediately
+        self.store.unlock(ach['id'])
+        self.store.flush()
 
     def _notify(self, ach):
         # Simple console notification; can be replaced with stddraw toast
         print(f"🏆 Achievement Unlocked: {ach['name']}")
-
-    def _save(self):
-        try:
-            import json
-            with open(self.save_path, 'w', encoding='utf-8') as f:
-                json.dump(list(self.unlocked), f, ensure_ascii=False, indent=2)
-        except Exception:
-            pass
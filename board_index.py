@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+board_index.py
+
+Zobrist hashing of board values and a bounded LRU index keyed by that
+hash, used to reuse evaluations, placement lists and landing tables of
+boards that were already seen (transpositions, repeated hint requests,
+dataset dedup).
+"""
+import random
+from collections import OrderedDict
+
+# log2 values 0..31 (0 = empty, which hashes to 0)
+N_VALUES = 32
+_SEED    = 0x2048
+
+_tables = {}
+
+
+def zobrist_table(grid_h, grid_w):
+    """
+    Per-cell random 64-bit keys as nested lists [row][col][log2 value].
+    Tables are deterministic and shared by every grid of the same size.
+    """
+    table = _tables.get((grid_h, grid_w))
+    if table is None:
+        rng = random.Random(_SEED ^ (grid_h << 16) ^ grid_w)
+        table = [[[0] + [rng.getrandbits(64) for _ in range(N_VALUES - 1)]
+                  for _ in range(grid_w)] for _ in range(grid_h)]
+        _tables[(grid_h, grid_w)] = table
+    return table
+
+
+def hash_row(table_row, row):
+    """Zobrist contribution of one row of log2 values."""
+    h = 0
+    for keys, v in zip(table_row, row):
+        if v:
+            h ^= keys[v]
+    return h
+
+
+def hash_values(rows, grid_w=None):
+    """Full Zobrist hash of a board given as rows of log2 values."""
+    rows = list(rows)
+    table = zobrist_table(len(rows), grid_w or len(rows[0]))
+    h = 0
+    for table_row, row in zip(table, rows):
+        h ^= hash_row(table_row, row)
+    return h
+
+
+class BoardIndex:
+    """
+    Bounded LRU cache of per-board results. Keys are (kind, key) pairs,
+    where kind names the cached quantity ('eval', 'placements',
+    'landing', ...) and key is usually (grid_h, grid_w, zobrist, ...).
+    """
+    def __init__(self, maxsize=100_000):
+        self.maxsize = maxsize
+        self.hits    = 0
+        self.misses  = 0
+        self._data   = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, kind_key):
+        return kind_key in self._data
+
+    def get(self, kind, key, default=None):
+        k = (kind, key)
+        try:
+            value = self._data[k]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(k)
+        self.hits += 1
+        return value
+
+    def put(self, kind, key, value):
+        k = (kind, key)
+        self._data[k] = value
+        self._data.move_to_end(k)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get_or_compute(self, kind, key, compute):
+        """Cached value, or compute() stored under (kind, key)."""
+        k = (kind, key)
+        try:
+            value = self._data[k]
+        except KeyError:
+            self.misses += 1
+            value = self._data[k] = compute()
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return value
+        self._data.move_to_end(k)
+        self.hits += 1
+        return value
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'size': len(self._data), 'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0}
+
+
+# Index shared by every GameGrid in the process
+default_index = BoardIndex()
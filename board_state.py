@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+board_state.py
+
+Compact value representation of a GameGrid used for snapshots, undo and
+search. Each row is an immutable bytes object of log2 tile numbers
+(0 = empty), so clones share every row and copy only the rows they write.
+"""
+import numpy as np
+
+
+class BoardState:
+    """Copy-on-write snapshot of a board's values, score and game-over flag."""
+    __slots__ = ('rows', 'width', 'score', 'game_over')
+
+    def __init__(self, rows, width, score=0, game_over=False):
+        self.rows      = rows        # list of bytes, row 0 at the bottom
+        self.width     = width
+        self.score     = score
+        self.game_over = game_over
+
+    @classmethod
+    def from_array(cls, values, score=0, game_over=False):
+        """Build a state from an (h, w) uint8 array of log2 values."""
+        values = np.asarray(values, dtype=np.uint8)
+        return cls([row.tobytes() for row in values], values.shape[1],
+                   score, game_over)
+
+    @property
+    def height(self):
+        return len(self.rows)
+
+    def clone(self):
+        """O(height) copy that shares all row buffers with self."""
+        return BoardState(list(self.rows), self.width, self.score,
+                          self.game_over)
+
+    def get(self, row, col):
+        """log2 of the tile number at (row, col), 0 if empty."""
+        return self.rows[row][col]
+
+    def number(self, row, col):
+        """Tile number at (row, col), 0 if empty."""
+        v = self.rows[row][col]
+        return 1 << v if v else 0
+
+    def set(self, row, col, value):
+        """Write a log2 value; only this row is copied."""
+        r = bytearray(self.rows[row])
+        r[col] = value
+        self.rows[row] = bytes(r)
+
+    def to_array(self):
+        return np.frombuffer(b''.join(self.rows), dtype=np.uint8) \
+                 .reshape(len(self.rows), self.width)
+
+    def diff(self, other):
+        """Cells whose value in self differs from other: [(row, col, value)]."""
+        changes = []
+        for y, (a, b) in enumerate(zip(self.rows, other.rows)):
+            if a is b or a == b:
+                continue
+            changes.extend((y, x, va) for x, (va, vb) in enumerate(zip(a, b))
+                           if va != vb)
+        return changes
+
+    def __eq__(self, other):
+        if not isinstance(other, BoardState):
+            return NotImplemented
+        return (self.rows == other.rows and self.score == other.score
+                and self.game_over == other.game_over)
+
+    def __repr__(self):
+        return (f"BoardState({self.height}x{self.width}, score={self.score}, "
+                f"game_over={self.game_over})")
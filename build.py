@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+build.py
+
+Builds the PyInstaller bundles from Tetris_2048.spec and measures their
+cold start: each executable is launched `--runs` times and timed until
+it exits. The game exits after its first menu frame
+(--startup-benchmark), so it needs a display; the headless targets play
+a single simulated game or print their usage.
+
+    python build.py [--mode onedir|onefile|both] [--target game] [--runs 5]
+    python build.py --no-build --source     # time the plain interpreter run
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SPEC = os.path.join(ROOT, 'Tetris_2048.spec')
+
+NAMES   = {'game': 'Tetris_2048', 'simulate': 'tetris2048-simulate',
+           'server': 'tetris2048-server'}
+SCRIPTS = {'game': 'Tetris_2048.py', 'simulate': 'simulate.py',
+           'server': 'game_server.py'}
+
+
+def bench_args(target, tmp):
+    return {'game':     ['--startup-benchmark'],
+            'simulate': ['--games', '1', '--workers', '0',
+                         '--db', os.path.join(tmp, 'bench.db')],
+            'server':   ['--help']}[target]
+
+
+def build(mode, target, dist):
+    """Run PyInstaller for one variant; returns the executable path."""
+    env = dict(os.environ, TETRIS_BUILD_MODE=mode, TETRIS_BUILD_TARGET=target,
+               PYTHONHASHSEED='0')      # stable bytecode and ordering
+    subprocess.run([sys.executable, '-m', 'PyInstaller', '--noconfirm',
+                    '--clean', '--distpath', dist,
+                    '--workpath', os.path.join(ROOT, 'build', mode, target),
+                    SPEC], env=env, check=True)
+    name = NAMES[target]
+    if mode == 'onefile':
+        return os.path.join(dist, name)
+    return os.path.join(dist, name, name)
+
+
+def measure(cmd, runs):
+    """Wall-clock seconds from launch to exit, one entry per run."""
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def report(label, times):
+    print(f"{label:28s} first {times[0]*1000:7.1f} ms   "
+          f"median {statistics.median(times)*1000:7.1f} ms   "
+          f"min {min(times)*1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and time bundles')
+    parser.add_argument('--mode', choices=('onedir', 'onefile', 'both'),
+                        default='both')
+    parser.add_argument('--target', choices=sorted(NAMES), default='game')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--no-build', action='store_true',
+                        help='time executables already in dist/')
+    parser.add_argument('--source', action='store_true',
+                        help='also time the script under this interpreter')
+    args = parser.parse_args()
+
+    modes = ('onedir', 'onefile') if args.mode == 'both' else (args.mode,)
+    with tempfile.TemporaryDirectory() as tmp:
+        extra = bench_args(args.target, tmp)
+        if args.source:
+            script = os.path.join(ROOT, SCRIPTS[args.target])
+            report('source', measure([sys.executable, script] + extra,
+                                     args.runs))
+        for mode in modes:
+            dist = os.path.join(ROOT, 'dist', mode)
+            if args.no_build:
+                name = NAMES[args.target]
+                exe = os.path.join(dist, *((name,) if mode == 'onefile'
+                                          else (name, name)))
+            else:
+                exe = build(mode, args.target, dist)
+            report(f'{mode} {args.target}', measure([exe] + extra, args.runs))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+frame_capture.py
+
+Recording mode. The game loop hands each rendered frame to a
+FrameRecorder as plain board data (log2 values, active piece cells,
+score); a bounded queue feeds a background thread that rasterizes the
+board offscreen with numpy and encodes it, either as a PNG sequence or
+as one animated PNG. Capturing only copies the small values array and
+never blocks: when the encoder falls behind, frames are dropped and
+counted.
+
+    python frame_capture.py clip.png --seed 7 --policy random
+"""
+import argparse
+import os
+import queue
+import random
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+# ─── Offscreen rasterizer ───────────────────────────────────────────────────
+# RGB per log2 value (0 = empty cell); values past the table reuse its end
+_PALETTE = np.array([
+    (205, 193, 180), (238, 228, 218), (237, 224, 200), (242, 177, 121),
+    (245, 149,  99), (246, 124,  95), (246,  94,  59), (237, 207, 114),
+    (237, 204,  97), (237, 200,  80), (237, 197,  63), (237, 194,  46),
+    ( 60,  58,  50), ( 50,  48,  42), ( 40,  38,  34), ( 30,  28,  26),
+], dtype=np.uint8)
+_LINE  = np.array((119, 110, 101), dtype=np.uint8)
+_DARK  = np.array((119, 110, 101), dtype=np.uint8)
+_LIGHT = np.array((249, 246, 242), dtype=np.uint8)
+_BAR   = np.array(( 42,  69,  99), dtype=np.uint8)
+
+# 3x5 digit glyphs, one string of rows per digit
+_DIGITS = ['111101101101111', '010110010010111', '111001111100111',
+           '111001111001111', '101101111001001', '111100111001111',
+           '111100111101111', '111001001001001', '111101111101111',
+           '111101111001111']
+_GLYPHS = [np.array([c == '1' for c in g]).reshape(5, 3) for g in _DIGITS]
+
+
+def _text_mask(s, scale):
+    """Boolean bitmap of a digit string, `scale` pixels per glyph dot."""
+    cols = []
+    for i, ch in enumerate(s):
+        if i:
+            cols.append(np.zeros((5, 1), dtype=bool))
+        cols.append(_GLYPHS[int(ch)])
+    mask = np.hstack(cols)
+    return np.kron(mask, np.ones((scale, scale), dtype=bool))
+
+
+def _blit(img, mask, y, x, color):
+    h, w = mask.shape
+    img[y:y+h, x:x+w][mask] = color
+
+
+class Rasterizer:
+    """
+    Renders boards to RGB arrays. Every possible tile is pre-rendered once
+    as a cell sprite, so a frame is a single fancy-indexing gather.
+    """
+    def __init__(self, grid_h, grid_w, cell=24):
+        self.grid_h, self.grid_w, self.cell = grid_h, grid_w, cell
+        self.bar = cell      # score strip above the board
+        self.sprites = np.stack([self._sprite(v) for v in range(32)])
+
+    def _sprite(self, v):
+        c = self.cell
+        tile = np.empty((c, c, 3), dtype=np.uint8)
+        tile[:] = _PALETTE[min(v, len(_PALETTE) - 1)]
+        tile[0, :] = tile[:, 0] = _LINE
+        if v:
+            digits = str(1 << v)
+            scale = min((c - 4) // (4*len(digits) - 1), (c - 4) // 10)
+            if scale >= 1:
+                mask = _text_mask(digits, scale)
+                _blit(tile, mask, (c - mask.shape[0]) // 2,
+                      (c - mask.shape[1]) // 2, _DARK if v <= 2 else _LIGHT)
+        return tile
+
+    @property
+    def shape(self):
+        return (self.bar + self.grid_h*self.cell, self.grid_w*self.cell, 3)
+
+    def render(self, values, cells=(), score=None):
+        """
+        RGB frame of a board: `values` are log2 tile values with row 0 at
+        the bottom, `cells` extra (row, col, log2) tiles such as the
+        falling piece.
+        """
+        v = np.array(values[::-1], dtype=np.intp)
+        for y, x, n in cells:
+            if 0 <= y < self.grid_h and 0 <= x < self.grid_w:
+                v[self.grid_h - 1 - y, x] = n
+        h, w, c = self.grid_h, self.grid_w, self.cell
+        board = self.sprites[v].transpose(0, 2, 1, 3, 4).reshape(h*c, w*c, 3)
+        img = np.empty(self.shape, dtype=np.uint8)
+        img[:self.bar] = _BAR
+        img[self.bar:] = board
+        if score is not None:
+            mask = _text_mask(str(score), max(1, self.bar // 8))
+            _blit(img, mask[:, :img.shape[1] - 4],
+                  (self.bar - mask.shape[0]) // 2, 4, _LIGHT)
+        return img
+
+
+# ─── PNG / APNG encoding ────────────────────────────────────────────────────
+_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def _chunk(tag, data):
+    return (struct.pack('>I', len(data)) + tag + data
+            + struct.pack('>I', zlib.crc32(tag + data)))
+
+
+def _ihdr(w, h):
+    # 8-bit truecolour, no interlace
+    return _chunk(b'IHDR', struct.pack('>IIBBBBB', w, h, 8, 2, 0, 0, 0))
+
+
+def _compress(img, level):
+    h, w, _ = img.shape
+    raw = np.zeros((h, 1 + 3*w), dtype=np.uint8)   # filter byte 0 per row
+    raw[:, 1:] = img.reshape(h, 3*w)
+    return zlib.compress(raw.tobytes(), level)
+
+
+def encode_png(img, level=6):
+    """PNG file bytes of an RGB uint8 array."""
+    h, w, _ = img.shape
+    return (_SIGNATURE + _ihdr(w, h)
+            + _chunk(b'IDAT', _compress(img, level)) + _chunk(b'IEND', b''))
+
+
+class APNGWriter:
+    """
+    Streams an animated PNG. Each frame after the first only stores the
+    bounding box of the pixels that changed, and the frame count in acTL
+    is patched in on close.
+    """
+    def __init__(self, path, level=6, plays=0):
+        self.level  = level
+        self.plays  = plays
+        self.frames = 0
+        self._seq   = 0
+        self._prev  = None
+        self._f     = open(path, 'wb')
+        self._actl  = None        # file offset of the acTL chunk
+
+    def write(self, img, delay):
+        """Append a frame shown for `delay` seconds."""
+        if self._prev is None:
+            h, w, _ = img.shape
+            self._f.write(_SIGNATURE + _ihdr(w, h))
+            self._actl = self._f.tell()
+            self._f.write(_chunk(b'acTL', struct.pack('>II', 0, self.plays)))
+            y0, x0, sub = 0, 0, img
+        else:
+            diff = (img != self._prev).any(axis=2)
+            rows = np.flatnonzero(diff.any(axis=1))
+            cols = np.flatnonzero(diff.any(axis=0))
+            if not len(rows):                  # unchanged: 1x1 no-op update
+                rows = cols = np.zeros(1, dtype=np.intp)
+            y0, y1 = int(rows[0]), int(rows[-1]) + 1
+            x0, x1 = int(cols[0]), int(cols[-1]) + 1
+            sub = img[y0:y1, x0:x1]
+        h, w, _ = sub.shape
+        ms = max(1, round(delay * 1000))
+        self._f.write(_chunk(b'fcTL', struct.pack(
+            '>IIIIIHHBB', self._seq, w, h, x0, y0, min(ms, 65535), 1000,
+            0, 0)))
+        self._seq += 1
+        data = _compress(sub, self.level)
+        if self._prev is None:
+            self._f.write(_chunk(b'IDAT', data))
+        else:
+            self._f.write(_chunk(b'fdAT', struct.pack('>I', self._seq) + data))
+            self._seq += 1
+        self._prev = img
+        self.frames += 1
+
+    def close(self):
+        if self._prev is not None:
+            self._f.write(_chunk(b'IEND', b''))
+            self._f.seek(self._actl)
+            self._f.write(_chunk(b'acTL', struct.pack('>II', self.frames,
+                                                      self.plays)))
+        self._f.close()
+
+
+# ─── Recorder ───────────────────────────────────────────────────────────────
+LAST_FRAME_HOLD = 2.0   # seconds the final frame of an animation is shown
+
+
+class FrameRecorder:
+    """
+    Non-blocking frame capture. `path` ending in .png/.apng writes one
+    animated PNG; any other path is a directory of numbered PNG frames.
+    """
+    def __init__(self, path, grid_h, grid_w, cell=24, maxsize=120, level=6):
+        self.raster   = Rasterizer(grid_h, grid_w, cell)
+        self.animated = path.lower().endswith(('.png', '.apng'))
+        self.path     = path
+        self.level    = level
+        self.captured = 0
+        self.dropped  = 0
+        self.written  = 0
+        self._queue   = queue.Queue(maxsize)
+        if self.animated:
+            self._writer = APNGWriter(path, level)
+        else:
+            os.makedirs(path, exist_ok=True)
+        self._thread = threading.Thread(target=self._encode, daemon=True)
+        self._thread.start()
+
+    def capture(self, values, cells=(), score=None, t=None, block=False):
+        """
+        Queue one frame; returns False if it had to be dropped. Offline
+        recorders pass block=True to wait for the encoder instead.
+        """
+        frame = (np.array(values, dtype=np.uint8), tuple(cells), score,
+                 time.monotonic() if t is None else t)
+        try:
+            self._queue.put(frame, block)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.captured += 1
+        return True
+
+    def capture_grid(self, grid, tetromino=None, t=None, block=False):
+        """Capture a GameGrid with its falling piece, if any."""
+        cells = piece_cells(tetromino) if tetromino is not None else ()
+        return self.capture(grid.values, cells, grid.score, t, block)
+
+    def _encode(self):
+        pending = None       # (image, time): its delay is known one frame later
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            values, cells, score, t = item
+            img = self.raster.render(values, cells, score)
+            if not self.animated:
+                name = os.path.join(self.path, f'frame_{self.written:06d}.png')
+                with open(name, 'wb') as f:
+                    f.write(encode_png(img, self.level))
+                self.written += 1
+                continue
+            if pending is not None:
+                if np.array_equal(pending[0], img):
+                    continue          # identical: the pending frame lasts longer
+                self._writer.write(pending[0], t - pending[1])
+                self.written += 1
+            pending = (img, t)
+        if pending is not None:
+            self._writer.write(pending[0], LAST_FRAME_HOLD)
+            self.written += 1
+
+    def close(self):
+        """Encode every queued frame and finish the output."""
+        self._queue.put(None)
+        self._thread.join()
+        if self.animated:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ─── Headless replays ───────────────────────────────────────────────────────
+def record_game(path, seed, policy='random', config=None, cell=24,
+                step_time=0.05, max_steps=100_000):
+    """Play a seeded game with a simulator policy and record every step."""
+    from simulate   import POLICIES
+    from tetris_env import TetrisEnv
+    env = TetrisEnv(config)
+    env.reset(seed)
+    rng = random.Random(seed)
+    act = POLICIES[policy]
+    cfg = env.config
+    # offline, so capture blocks rather than dropping frames
+    with FrameRecorder(path, cfg.grid_h, cfg.grid_w, cell) as rec:
+        for step in range(max_steps):
+            rec.capture_grid(env.grid, env.current, step*step_time, True)
+            _, _, done, _ = env.step(act(env, rng))
+            if done:
+                break
+        rec.capture_grid(env.grid, None, (step + 1)*step_time, True)
+    return rec
+
+
+def piece_cells(tetromino):
+    """(row, col, log2 value) of every tile of a tetromino."""
+    return [(t.position.y, t.position.x, t.number.bit_length() - 1)
+            for col in tetromino.tile_matrix for t in col if t]
+
+
+def main():
+    import game_config
+    parser = argparse.ArgumentParser(description='Record a seeded game')
+    game_config.add_arguments(parser)
+    parser.add_argument('output', help='.png for an animation, else a folder')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policy', default='random')
+    parser.add_argument('--cell', type=int, default=24)
+    parser.add_argument('--step-time', type=float, default=0.05,
+                        help='seconds each step is shown')
+    args = parser.parse_args()
+    t0 = time.perf_counter()
+    rec = record_game(args.output, args.seed, args.policy,
+                      game_config.from_args(args), args.cell, args.step_time)
+    print(f"{rec.written} frames written in {time.perf_counter() - t0:.1f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""
+fuzz_rules.py
+
+Differential fuzzing of the rule engine. Random seeded cases (a grid
+size, a list of pieces and a sequence of moves, rotations and drops that
+plays them through the real Tetromino) are played through ReferenceGrid,
+a literal port of the original object-based rules, and through an engine
+under test; board, score and game-over state are compared after every
+lock. A failing case is shrunk greedily over its action sequence, pieces
+and board to a minimal reproduction, printed as JSON and replayable with
+--replay.
+
+    python fuzz_rules.py --cases 2000 [--seed 0] [--engine gamegrid]
+                         [--mode vertical|horizontal|full]
+    python fuzz_rules.py --replay failure.json
+
+The default mode compares the rules the original game had: vertical
+merges, row clearing and gravity after a lock. --mode horizontal / full
+compare the extra merge modes against MergeReferenceGrid, which spells
+their rules out cell by cell on top of the original ones. Pieces move
+and rotate against the reference board, so a divergence in the engine
+under test shows up at the lock it first affects.
+"""
+import argparse
+import json
+import random
+import sys
+
+import numpy as np
+
+from point import Point
+from board_index import hash_values
+
+
+# ─── Reference rules ────────────────────────────────────────────────────────
+class _Tile:
+    """Duck-typed stand-in for tile.Tile: what the rules touch, nothing more."""
+    __slots__ = ('number', 'position', 'background_color')
+
+    def __init__(self, x, y, number):
+        self.number = number
+        self.position = Point(x, y)
+        self.background_color = None
+
+    def get_position(self):
+        return Point(self.position.x, self.position.y)
+
+    def move(self, dx, dy):
+        self.position.translate(dx, dy)
+
+    def color_generator(self):
+        return None
+
+
+class ReferenceGrid:
+    """
+    The original GameGrid rules, kept verbatim (drawing removed) as the
+    oracle: bottom-up restarting merges in touched columns only, rows
+    cleared in ascending order against stale indices, then gravity.
+    """
+    def __init__(self, grid_h, grid_w):
+        self.grid_height = grid_h
+        self.grid_width  = grid_w
+        self.tile_matrix = np.full((grid_h, grid_w), None)
+        self.game_over   = False
+        self.score       = 0
+
+    def is_inside(self, row, col):
+        return 0 <= row < self.grid_height and 0 <= col < self.grid_width
+
+    def is_occupied(self, row, col):
+        if not self.is_inside(row, col):
+            return False
+        return self.tile_matrix[row][col] is not None
+
+    def update_grid(self, tiles_to_place):
+        self.game_over = False
+        n_rows, n_cols = len(tiles_to_place), len(tiles_to_place[0])
+        for col in range(n_cols):
+            for row in range(n_rows):
+                tile = tiles_to_place[row][col]
+                if tile is not None:
+                    pos = tile.get_position()
+                    if not self.is_inside(pos.y, pos.x):
+                        self.game_over = True
+                    else:
+                        if self.tile_matrix[pos.y][pos.x] is not None:
+                            self.game_over = True
+                        else:
+                            self.tile_matrix[pos.y][pos.x] = tile
+        return self.game_over
+
+    def sumCheck(self, columnSet, current_tetromino):
+        for x in columnSet:
+            merged = True
+            while merged:
+                merged = False
+                for y in range(self.grid_height - 1):
+                    bottom = self.tile_matrix[y][x]
+                    top    = self.tile_matrix[y+1][x]
+                    if bottom and top and bottom.number == top.number:
+                        bottom.number *= 2
+                        self.score   += bottom.number
+                        bottom.background_color = bottom.color_generator()
+                        self.tile_matrix[y+1][x] = None
+                        for yy in range(y+2, self.grid_height):
+                            t = self.tile_matrix[yy][x]
+                            if t:
+                                t.move(0, -1)
+                                self.tile_matrix[yy-1][x] = t
+                                self.tile_matrix[yy][x]   = None
+                        merged = True
+                        break
+        self.applyGravity()
+
+    def rowCheck(self, rowSet):
+        validRows = sorted(y for y in rowSet if 0 <= y < self.grid_height)
+        for y in validRows:
+            if not all(self.tile_matrix[y][x] is not None
+                       for x in range(self.grid_width)):
+                continue
+            for x in range(self.grid_width):
+                self.score += self.tile_matrix[y][x].number
+                self.tile_matrix[y][x] = None
+            for yy in range(y+1, self.grid_height):
+                for x in range(self.grid_width):
+                    t = self.tile_matrix[yy][x]
+                    if t:
+                        t.move(0, -1)
+                        self.tile_matrix[yy-1][x] = t
+                        self.tile_matrix[yy][x]   = None
+        self.applyGravity()
+
+    def applyGravity(self):
+        for x in range(self.grid_width):
+            for y in range(1, self.grid_height):
+                tile = self.tile_matrix[y][x]
+                if tile and self.tile_matrix[y-1][x] is None:
+                    ny = y
+                    while ny > 0 and self.tile_matrix[ny-1][x] is None:
+                        tile.move(0, -1)
+                        self.tile_matrix[ny-1][x] = tile
+                        self.tile_matrix[ny][x]   = None
+                        ny -= 1
+
+    def lock(self, tiles):
+        """The original game loop's PLACE & CHECKS step."""
+        game_over = self.update_grid(tiles)
+        self.rowCheck({t.position.y for col in tiles for t in col if t})
+        self.sumCheck({t.position.x for col in tiles for t in col if t}, None)
+        return game_over
+
+
+class MergeReferenceGrid(ReferenceGrid):
+    """
+    The 'horizontal' and 'full' merge modes written out literally. Each
+    pass clears every full row (rowCheck), runs sumCheck on the piece's
+    columns (on the first pass) or on the columns the previous pass
+    changed, then one horizontal round (pairs collected bottom-up and
+    left to right before any merges, each cell in at most one merge, into
+    the left tile, then gravity); passes repeat until one finds no full
+    row and no pair. In 'horizontal' mode a pair needs a cell whose number
+    changed during the lock; in 'full' mode every pair counts and sumCheck
+    covers every column.
+    """
+    def __init__(self, grid_h, grid_w, mode):
+        super().__init__(grid_h, grid_w)
+        self.full = mode == 'full'
+
+    def _changed(self, before):
+        after = _numbers(self.tile_matrix)
+        return {(y, x) for y in range(self.grid_height)
+                for x in range(self.grid_width) if before[y][x] != after[y][x]}
+
+    def _horizontal_round(self, touched):
+        pairs = []
+        for y in range(self.grid_height):
+            for x in range(self.grid_width - 1):
+                left, right = self.tile_matrix[y][x], self.tile_matrix[y][x+1]
+                if left and right and left.number == right.number and (
+                        self.full or (y, x) in touched
+                        or (y, x + 1) in touched):
+                    pairs.append((y, x))
+        used = set()
+        for y, x in pairs:
+            if (y, x) in used or (y, x + 1) in used:
+                continue
+            used.update({(y, x), (y, x + 1)})
+            left = self.tile_matrix[y][x]
+            left.number *= 2
+            self.score  += left.number
+            left.background_color = left.color_generator()
+            self.tile_matrix[y][x+1] = None
+        self.applyGravity()
+        return len(used) // 2
+
+    def _full_rows(self):
+        return [y for y in range(self.grid_height)
+                if all(t is not None for t in self.tile_matrix[y])]
+
+    def lock(self, tiles):
+        game_over = self.update_grid(tiles)
+        cells = [t.position for col in tiles for t in col if t]
+        touched = {(p.y, p.x) for p in cells if self.is_inside(p.y, p.x)}
+        all_columns = set(range(self.grid_width))
+        columns = all_columns if self.full else {p.x for p in cells}
+        while True:
+            before = _numbers(self.tile_matrix)
+            full_rows = self._full_rows()
+            self.rowCheck(full_rows)
+            touched |= self._changed(before)
+            self.sumCheck(columns, None)
+            touched |= self._changed(before)
+            merged = self._horizontal_round(touched)
+            if not full_rows and not merged:
+                return game_over
+            changed = self._changed(before)
+            touched |= changed
+            columns = all_columns if self.full else {x for _, x in changed}
+
+
+# ─── Engines ────────────────────────────────────────────────────────────────
+class _Piece:
+    """Duck-typed tetromino: just the tile matrix lock_tetromino reads."""
+    def __init__(self, tiles):
+        self.tile_matrix = tiles
+
+
+def _numbers(tile_matrix):
+    return [[t.number if t is not None else 0 for t in row]
+            for row in tile_matrix]
+
+
+def _misplaced(tile_matrix):
+    """Cells whose tile does not know its own position."""
+    return [(y, x) for y, row in enumerate(tile_matrix)
+            for x, t in enumerate(row)
+            if t is not None and (t.position.y, t.position.x) != (y, x)]
+
+
+class ReferenceEngine:
+    def __init__(self, grid_h, grid_w, mode='vertical'):
+        if mode == 'vertical':
+            self.grid = ReferenceGrid(grid_h, grid_w)
+        else:
+            self.grid = MergeReferenceGrid(grid_h, grid_w, mode)
+
+    def load(self, tiles):
+        self.grid.update_grid(tiles)
+
+    def lock(self, tiles):
+        return self.grid.lock(tiles)
+
+    def board(self):
+        return _numbers(self.grid.tile_matrix)
+
+    def score(self):
+        return self.grid.score
+
+    def problems(self):
+        return [f"tile at {c} has a stale position"
+                for c in _misplaced(self.grid.tile_matrix)]
+
+
+class GameGridEngine(ReferenceEngine):
+    """GameGrid in the given merge mode, plus its own invariants."""
+    def __init__(self, grid_h, grid_w, mode='vertical'):
+        from game_grid import GameGrid
+        self.grid = GameGrid(grid_h, grid_w)
+        self.mode = mode
+
+    def lock(self, tiles):
+        return self.grid.lock_tetromino(_Piece(tiles),
+                                        merge_mode=self.mode)[0]
+
+    def problems(self):
+        g = self.grid
+        found = super().problems()
+        numbers = np.array(self.board(), dtype=np.int64)
+        log2 = np.zeros(numbers.shape, dtype=np.int64)
+        filled = numbers > 0
+        log2[filled] = np.log2(numbers[filled]).astype(np.int64)
+        if not np.array_equal(log2, g.values):
+            found.append("values mirror differs from tile_matrix")
+        if g.zobrist != hash_values(g.values.tolist(), g.grid_width):
+            found.append("incremental Zobrist hash is stale")
+        if g.row_counts != filled.sum(axis=1).tolist():
+            found.append("row_counts are stale")
+        v = g.values
+        for x in range(g.grid_width):
+            pairs = {y for y in range(g.grid_height - 1)
+                     if v[y, x] and v[y, x] == v[y+1, x]}
+            if g._pairs[x] != pairs:
+                found.append(f"equal-pair set of column {x} is stale")
+        return found
+
+
+class CloneEngine(GameGridEngine):
+    """
+    GameGrid where every lock is played on a fresh clone; the grid it was
+    cloned from must come out untouched (tiles are shared copy-on-write).
+    """
+    def lock(self, tiles):
+        parent = self.grid
+        before = self.board(), _misplaced(parent.tile_matrix), parent.score
+        self.grid = parent.clone()
+        over = super().lock(tiles)
+        self._parent_changed = \
+            before != (_numbers(parent.tile_matrix),
+                       _misplaced(parent.tile_matrix), parent.score)
+        return over
+
+    def problems(self):
+        found = super().problems()
+        if getattr(self, '_parent_changed', False):
+            found.append("lock on a clone changed the original grid")
+        return found
+
+
+ENGINES = {'gamegrid': GameGridEngine, 'clone': CloneEngine}
+MODES   = ('vertical', 'horizontal', 'full')
+
+
+# ─── Cases ──────────────────────────────────────────────────────────────────
+ACTIONS = ('left', 'right', 'down', 'rotate', 'drop')
+_WEIGHTS = (3, 3, 2, 2, 1)
+
+
+class _Spawn:
+    """
+    Duck-typed random source for Tetromino: the piece spawns at a fixed
+    column (clamped to the board) and numbers its tiles from a list.
+    """
+    def __init__(self, col, numbers):
+        self.col = col
+        self.numbers = iter(numbers)
+
+    def randint(self, lo, hi):
+        return max(lo, min(self.col, hi))
+
+    def choices(self, population, weights):
+        return [next(self.numbers)]
+
+
+def random_case(rng):
+    """
+    A case is a JSON-able dict: grid size, pieces [type, spawn column,
+    numbers] (numbers in the order Tetromino creates its tiles) and the
+    actions that play them, one of ACTIONS each. A piece that cannot move
+    down, or is dropped, locks and the next one spawns. Optional keys:
+    'board', a starting board (rows of tile numbers, row 0 at the bottom)
+    for hand-written cases, and 'mode', the merge mode (default vertical).
+    """
+    h, w = rng.randint(4, 14), rng.randint(4, 10)
+    small = [2, 2, 2, 4, 4, 8, 16]     # small numbers make merges likely
+    pieces = [[rng.choice('IOZSTLJ'), rng.randrange(w),
+               [rng.choice(small) for _ in range(4)]]
+              for _ in range(rng.randint(1, 40))]
+    actions = rng.choices(ACTIONS, _WEIGHTS, k=rng.randint(1, 300))
+    return {'h': h, 'w': w, 'pieces': pieces, 'actions': actions}
+
+
+def _board_tiles(case):
+    board = case.get('board') or [[0] * case['w'] for _ in range(case['h'])]
+    return np.array([[_Tile(x, y, n) if n else None
+                      for x, n in enumerate(row)]
+                     for y, row in enumerate(board)], dtype=object)
+
+
+def _spawn(case, k):
+    from tetromino import Tetromino
+    kind, col, numbers = case['pieces'][k]
+    return Tetromino(kind, case['h'], case['w'], _Spawn(col, numbers),
+                     values={2: 1})
+
+
+def _play(case, engine='gamegrid'):
+    """
+    Play a case: the pieces move through the real Tetromino against the
+    reference board, and each lock goes to the reference and the engine.
+    Returns (failure, engine) where failure is None when they agree
+    throughout, else (lock index, message); index -1 is the starting board.
+    """
+    mode = case.get('mode', 'vertical')
+    ref  = ReferenceEngine(case['h'], case['w'], mode)
+    test = ENGINES[engine](case['h'], case['w'], mode)
+    ref.load(_board_tiles(case))
+    test.load(_board_tiles(case))
+    if ref.board() != test.board():
+        return (-1, "starting boards differ"), test
+    if not case['pieces']:
+        return None, test
+    i, piece = 0, _spawn(case, 0)
+    for action in case['actions']:
+        if action == 'rotate':
+            piece.rotateTetromino(ref.grid)
+            continue
+        if action in ('left', 'right'):
+            piece.move(action, ref.grid)
+            continue
+        if action == 'drop':
+            while piece.move('down', ref.grid):
+                pass
+        elif piece.move('down', ref.grid):
+            continue
+        try:
+            over = test.lock(piece.clone().tile_matrix)
+        except Exception as e:          # a crash is a divergence too
+            return (i, f"engine raised {type(e).__name__}: {e}"), test
+        ref_over = ref.lock(piece.tile_matrix)
+        if ref.board() != test.board():
+            return (i, "boards differ"), test
+        if ref.score() != test.score():
+            return (i, f"score {test.score()} != reference "
+                       f"{ref.score()}"), test
+        if ref_over != over:
+            return (i, f"game_over {over} != reference {ref_over}"), test
+        problems = test.problems()
+        if problems:
+            return (i, '; '.join(problems)), test
+        i += 1
+        if over or i == len(case['pieces']):
+            break
+        piece = _spawn(case, i)
+    return None, test
+
+
+def run_case(case, engine='gamegrid'):
+    """_play's failure alone: None or (lock index, message)."""
+    return _play(case, engine)[0]
+
+
+# ─── Shrinking ──────────────────────────────────────────────────────────────
+def _column_tops(board):
+    for x in range(len(board[0])):
+        ys = [y for y in range(len(board)) if board[y][x]]
+        if ys:
+            yield ys[-1], x
+
+
+def _simplifications(case, failed_at):
+    """Smaller variants of a failing case, most aggressive first."""
+    pieces, actions = case['pieces'], case['actions']
+    if failed_at + 1 < len(pieces):
+        yield dict(case, pieces=pieces[:failed_at + 1])
+    # remove runs of actions, halving the run length down to single ones
+    size = len(actions) // 2
+    while size:
+        for i in range(len(actions) - size, -1, -size):
+            yield dict(case, actions=actions[:i] + actions[i+size:])
+        size //= 2
+    for i, action in enumerate(actions):
+        if action in ('left', 'right', 'rotate'):
+            yield dict(case, actions=actions[:i] + ['drop'] + actions[i+1:])
+    for i in range(len(pieces)):
+        yield dict(case, pieces=pieces[:i] + pieces[i+1:])
+    for i, piece in enumerate(pieces):
+        simpler = ['O', 0, [2] * 4]
+        for field in range(3):
+            p = list(piece)
+            p[field] = simpler[field]
+            if p != piece:
+                yield dict(case, pieces=pieces[:i] + [p] + pieces[i+1:])
+    board = case.get('board')
+    if case['w'] > 4:                  # the I piece needs four columns
+        yield dict(case, w=case['w'] - 1,
+                   **({'board': [r[:-1] for r in board]} if board else {}))
+    if case['h'] > 4 and not (board and any(board[-1])):
+        yield dict(case, h=case['h'] - 1,
+                   **({'board': board[:-1]} if board else {}))
+    if not board:
+        return
+    if any(any(r) for r in board):
+        yield dict(case, board=[[0] * case['w'] for _ in board])
+    for y, x in _column_tops(board):
+        smaller = [r[:] for r in board]
+        smaller[y][x] = 0
+        yield dict(case, board=smaller)
+    for y, row in enumerate(board):
+        for x, n in enumerate(row):
+            if n > 2:
+                smaller = [r[:] for r in board]
+                smaller[y][x] = n // 2
+                yield dict(case, board=smaller)
+
+
+def shrink(case, engine='gamegrid'):
+    """Greedily apply simplifications while the case keeps failing."""
+    failure = run_case(case, engine)
+    progress = True
+    while progress:
+        progress = False
+        for candidate in _simplifications(case, failure[0]):
+            result = run_case(candidate, engine)
+            if result is not None:
+                case, failure, progress = candidate, result, True
+                break
+    return case, failure
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Differential rule fuzzer')
+    parser.add_argument('--cases', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='gamegrid')
+    parser.add_argument('--mode', choices=MODES, default='vertical',
+                        help='merge mode of generated cases')
+    parser.add_argument('--replay', metavar='FILE',
+                        help='run one case saved as JSON')
+    parser.add_argument('--out', default='failure.json',
+                        help='where a shrunk failing case is written')
+    args = parser.parse_args()
+
+    if args.replay:
+        with open(args.replay) as f:
+            case = json.load(f)
+        failure = run_case(case, args.engine)
+        print('ok' if failure is None else f"lock {failure[0]}: {failure[1]}")
+        sys.exit(failure is not None)
+
+    for n in range(args.cases):
+        seed = args.seed + n
+        case = random_case(random.Random(seed))
+        if args.mode != 'vertical':
+            case['mode'] = args.mode
+        failure = run_case(case, args.engine)
+        if failure is None:
+            continue
+        print(f"seed {seed}: lock {failure[0]}: {failure[1]}; shrinking")
+        case, failure = shrink(case, args.engine)
+        with open(args.out, 'w') as f:
+            json.dump(case, f)
+        print(f"minimal case ({len(case['pieces'])} pieces, "
+              f"{len(case['actions'])} actions, "
+              f"{case['h']}x{case['w']}): lock {failure[0]}: {failure[1]}")
+        print(json.dumps(case))
+        sys.exit(1)
+    print(f"{args.cases} cases agree")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+game_config.py
+
+Game setup: board size, piece set, spawn value distribution, gravity
+speed curve and merge/clear rules. A config starts from a named preset
+and can be overridden from a JSON file or the command line.
+"""
+import json
+
+# All seven tetromino types understood by Tetromino
+ALL_PIECES = ('I', 'O', 'Z', 'S', 'T', 'L', 'J')
+
+# Merge rules: 'vertical' is the original column merge of sumCheck;
+# 'horizontal' keeps it and also merges left/right neighbours around the
+# cells a lock changed; 'full' applies both to every column and pair
+MERGE_MODES = ('vertical', 'horizontal', 'full')
+
+PRESETS = {
+    # the original game: 20x12 board, I/O/Z pieces, fixed 300 ms gravity,
+    # pieces lock as soon as they land
+    'classic': {},
+    # every tetromino and a gravity curve that speeds up every 10 lines,
+    # reaching tens of drops per second at the top levels
+    'full': {
+        'pieces': list(ALL_PIECES),
+        'gravity_curve': [300, 250, 200, 160, 125, 100, 80, 60, 45, 33,
+                          25, 20, 16],
+        'soft_drop_curve': [40, 35, 30, 25, 20, 16],
+        'lock_delay_curve': [500, 480, 460, 440, 420, 400, 380, 360, 340,
+                             320, 300, 280, 250],
+    },
+    # large board for load-testing the rules engine and the renderer
+    'stress': {
+        'grid_h': 100, 'grid_w': 60,
+        'pieces': list(ALL_PIECES),
+        'spawn_values': {'2': 0.5, '4': 0.3, '8': 0.2},
+        'gravity_curve': [20],
+        'soft_drop_curve': [5],
+    },
+}
+
+
+class GameConfig:
+    """Class used for describing the rules and dimensions of one game."""
+    def __init__(self, grid_h=20, grid_w=12, extra_cols=4,
+                 pieces=('I', 'O', 'Z'), spawn_values=None,
+                 gravity_curve=(300,), soft_drop_curve=(50,),
+                 lock_delay_curve=(0,), lines_per_level=10, merges_per_line=4,
+                 merge_tiles=True, merge_mode='vertical', clear_rows=True):
+        # Board dimensions (extra_cols is the sidebar width)
+        self.grid_h     = int(grid_h)
+        self.grid_w     = int(grid_w)
+        self.extra_cols = int(extra_cols)
+        # Piece set and spawn value distribution {value: weight};
+        # None keeps the tile's own default numbering
+        self.pieces       = tuple(pieces)
+        self.spawn_values = None if spawn_values is None else \
+            {int(v): float(w) for v, w in spawn_values.items()}
+        # Gravity, soft-drop and lock-delay intervals (ms) per level; a
+        # level is lines_per_level lines, merges_per_line merges count as one
+        self.gravity_curve    = tuple(int(ms) for ms in gravity_curve)
+        self.soft_drop_curve  = tuple(int(ms) for ms in soft_drop_curve)
+        self.lock_delay_curve = tuple(int(ms) for ms in lock_delay_curve)
+        self.lines_per_level  = int(lines_per_level)
+        self.merges_per_line  = int(merges_per_line)
+        # Rules
+        self.merge_tiles = bool(merge_tiles)
+        self.merge_mode  = merge_mode
+        self.clear_rows  = bool(clear_rows)
+        self._validate()
+
+    def _validate(self):
+        if self.grid_h < 4 or self.grid_w < 4:
+            raise ValueError("Board must be at least 4x4")
+        unknown = set(self.pieces) - set(ALL_PIECES)
+        if not self.pieces or unknown:
+            raise ValueError(f"Invalid piece set: {self.pieces}")
+        if self.spawn_values is not None:
+            if not self.spawn_values or any(
+                    v < 2 or v & (v - 1) for v in self.spawn_values):
+                raise ValueError("Spawn values must be powers of two >= 2")
+        for curve in (self.gravity_curve, self.soft_drop_curve):
+            if not curve or min(curve) <= 0:
+                raise ValueError("Drop curves must hold positive intervals")
+        if not self.lock_delay_curve or min(self.lock_delay_curve) < 0:
+            raise ValueError("Lock delays must not be negative")
+        if self.merge_mode not in MERGE_MODES:
+            raise ValueError(f"merge_mode must be one of {MERGE_MODES}")
+        if self.lines_per_level <= 0 or self.merges_per_line <= 0:
+            raise ValueError("lines_per_level/merges_per_line must be positive")
+
+    def to_dict(self):
+        d = dict(vars(self))
+        d['pieces'] = list(self.pieces)
+        d['gravity_curve'] = list(self.gravity_curve)
+        d['soft_drop_curve'] = list(self.soft_drop_curve)
+        d['lock_delay_curve'] = list(self.lock_delay_curve)
+        if self.spawn_values is not None:
+            d['spawn_values'] = {str(v): w for v, w in self.spawn_values.items()}
+        return d
+
+    @classmethod
+    def from_dict(cls, d, preset='classic'):
+        """Build a config from a preset updated with the keys of d."""
+        if preset not in PRESETS:
+            raise ValueError(f"Unknown preset: {preset}")
+        merged = dict(PRESETS[preset])
+        merged.update(d)
+        return cls(**merged)
+
+    @classmethod
+    def load(cls, path, preset=None):
+        """
+        Load a JSON config file; its "preset" key selects the base unless
+        a preset is given explicitly.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            d = json.load(f)
+        # always drop the key: it is not a GameConfig argument
+        base = d.pop('preset', 'classic')
+        return cls.from_dict(d, preset or base)
+
+
+def add_arguments(parser):
+    """Register the config options on an argparse parser."""
+    parser.add_argument('--preset', choices=sorted(PRESETS), default=None,
+                        help='rule preset (default: classic)')
+    parser.add_argument('--config', help='JSON config file')
+    parser.add_argument('--rows', type=int, help='board height')
+    parser.add_argument('--cols', type=int, help='board width')
+    parser.add_argument('--pieces',
+                        help='piece set, e.g. IOZ or IOZSTLJ')
+    parser.add_argument('--merge-mode', choices=MERGE_MODES,
+                        help='tile merge rule (default: vertical)')
+
+def from_args(args):
+    """Build a GameConfig from parsed add_arguments() options."""
+    if args.config:
+        config = GameConfig.load(args.config, args.preset).to_dict()
+    else:
+        config = {}
+    if args.rows is not None:
+        config['grid_h'] = args.rows
+    if args.cols is not None:
+        config['grid_w'] = args.cols
+    if args.pieces:
+        config['pieces'] = list(args.pieces.upper())
+    if args.merge_mode:
+        config['merge_mode'] = args.merge_mode
+    return GameConfig.from_dict(config, args.preset or 'classic')
@@ -1,16 +1,45 @@
 #!/usr/bin/env python3
+import copy
 import stddraw
 from color import Color
+from point import Point
+from tile import Tile
+from board_state import BoardState
+from board_index import default_index, zobrist_table, hash_row
+from game_config import MERGE_MODES
 import numpy as np
 
 class GameGrid:
     """Class used for modelling the 2048-Tetris hybrid game grid."""
-    def __init__(self, grid_h, grid_w):
+    def __init__(self, grid_h, grid_w, index=None):
         # Dimensions
         self.grid_height   = grid_h
         self.grid_width    = grid_w
         # Matrix of tiles (Tile instances or None)
         self.tile_matrix   = np.full((grid_h, grid_w), None)
+        # Compact mirror of tile_matrix: log2 of each tile number (0 = empty).
+        # All writes go through _set so the two never diverge.
+        self.values        = np.zeros((grid_h, grid_w), dtype=np.uint8)
+        # Row bytes of the last snapshot and rows written since then
+        self._rows         = [bytes(grid_w)] * grid_h
+        self._dirty_rows   = set()
+        # Zobrist hash of values, updated on every cell write, and the
+        # LRU index of per-board results keyed by it
+        self._zkeys        = zobrist_table(grid_h, grid_w)
+        self.zobrist       = 0
+        self.index         = default_index if index is None else index
+        # Incremental post-lock bookkeeping, also maintained by _set:
+        # tiles per row, rows y of each column where (y, y+1) hold equal
+        # tiles, and the lowest written row of each column since the last
+        # gravity pass (only those columns can hold floating tiles)
+        self.row_counts    = [0] * grid_h
+        self._pairs        = [set() for _ in range(grid_w)]
+        self._dirty_cols   = {}
+        # Rows whose Tile objects may also be referenced by a clone; a tile
+        # in them is copied (with its row) before it is mutated
+        self._shared       = set()
+        # Numbers created by merges during the last lock, for statistics
+        self.merged_values = []
         # Active tetromino
         self.current_tetromino = None
         # Game over flag
@@ -33,22 +62,19 @@ class GameGrid:
     def draw_grid(self):
         """Draw filled tiles and internal grid lines."""
         # Draw existing tiles
-        for row in range(self.grid_height):
-            for col in range(self.grid_width):
-                tile = self.tile_matrix[row][col]
-                if tile is not None:
-                    tile.draw()
+        for tile in self.tile_matrix[self.tile_matrix != None]:
+            tile.draw()
         # Draw grid lines
         stddraw.setPenColor(self.line_color)
         stddraw.setPenRadius(self.line_thickness)
         start_x, end_x = -0.5, self.grid_width - 0.5
         start_y, end_y = -0.5, self.grid_height - 0.5
         # Vertical lines
-        for x in np.arange(start_x + 1, end_x, 1):
-            stddraw.line(x, start_y, x, end_y)
+        xs = np.arange(start_x + 1, end_x, 1)
+        stddraw.lines(xs, np.full_like(xs, start_y), xs, np.full_like(xs, end_y))
         # Horizontal lines
-        for y in np.arange(start_y + 1, end_y, 1):
-            stddraw.line(start_x, y, end_x, y)
+        ys = np.arange(start_y + 1, end_y, 1)
+        stddraw.lines(np.full_like(ys, start_x), ys, np.full_like(ys, end_x), ys)
         stddraw.setPenRadius()
 
     def draw_boundaries(self):
@@ -69,6 +95,174 @@ class GameGrid:
             return False
         return self.tile_matrix[row][col] is not None
 
+    def _set(self, row, col, tile):
+        """Write a cell of tile_matrix and its compact value."""
+        self.tile_matrix[row][col] = tile
+        new = 0 if tile is None else tile.number.bit_length() - 1
+        old = int(self.values[row, col])
+        if old != new:
+            keys = self._zkeys[row][col]
+            self.zobrist ^= keys[old] ^ keys[new]
+            self.values[row, col] = new
+            if not old or not new:
+                self.row_counts[row] += 1 if new else -1
+            self._update_pair(row - 1, col)
+            self._update_pair(row, col)
+        self._dirty_rows.add(row)
+        lowest = self._dirty_cols.get(col)
+        if lowest is None or row < lowest:
+            self._dirty_cols[col] = row
+
+    def _update_pair(self, row, col):
+        """Track whether (row, col) and (row+1, col) hold equal tiles."""
+        if 0 <= row < self.grid_height - 1:
+            v = self.values[row, col]
+            if v and v == self.values[row + 1, col]:
+                self._pairs[col].add(row)
+            else:
+                self._pairs[col].discard(row)
+
+    def _own(self, row, col):
+        """
+        The tile at (row, col), safe to mutate: if its row is shared with a
+        clone, the row's tiles are copied first.
+        """
+        tiles = self.tile_matrix[row]
+        if row in self._shared:
+            self._shared.discard(row)
+            for x in range(self.grid_width):
+                t = tiles[x]
+                if t is not None:
+                    t = copy.copy(t)
+                    t.position = Point(t.position.x, t.position.y)
+                    tiles[x] = t
+        return tiles[col]
+
+    def _drop(self, row, col, dy=1):
+        """Move the tile at (row, col) down by dy cells."""
+        t = self._own(row, col)
+        t.move(0, -dy)
+        self._set(row - dy, col, t)
+        self._set(row, col, None)
+
+    # ─── Snapshots ────────────────────────────────────────────────────────
+    def snapshot(self):
+        """
+        Return a BoardState of the current values. Rows unchanged since the
+        previous snapshot are shared with it, so the cost is proportional
+        to the number of rows written in between.
+        """
+        for y in self._dirty_rows:
+            self._rows[y] = self.values[y].tobytes()
+        self._dirty_rows.clear()
+        return BoardState(list(self._rows), self.grid_width, self.score,
+                          self.game_over)
+
+    def restore(self, state):
+        """Return the grid to a BoardState; only differing rows are rebuilt."""
+        if (state.height, state.width) != (self.grid_height, self.grid_width):
+            raise ValueError("BoardState does not match the grid size")
+        for y in self._dirty_rows:
+            self._rows[y] = self.values[y].tobytes()
+        self._dirty_rows.clear()
+        for y, row in enumerate(state.rows):
+            if row is self._rows[y] or row == self._rows[y]:
+                self._rows[y] = row
+                continue
+            for x, v in enumerate(row):
+                tile = self.tile_matrix[y][x]
+                if v == 0:
+                    tile = None
+                elif tile is None or tile.number != 1 << v:
+                    tile = self._make_tile(y, x, v)
+                self.tile_matrix[y][x] = tile
+            self.values[y] = np.frombuffer(row, dtype=np.uint8)
+            self.zobrist ^= hash_row(self._zkeys[y], self._rows[y]) ^ \
+                            hash_row(self._zkeys[y], row)
+            self._rows[y] = row
+            self.row_counts[y] = self.grid_width - row.count(0)
+            for x in range(self.grid_width):
+                self._update_pair(y - 1, x)
+                self._update_pair(y, x)
+                lowest = self._dirty_cols.get(x)
+                if lowest is None or y < lowest:
+                    self._dirty_cols[x] = y
+        self.score     = state.score
+        self.game_over = state.game_over
+
+    def clone(self):
+        """
+        Independent copy of this grid (and of its active tetromino). The
+        matrices and bookkeeping are copied, but Tile objects are shared
+        copy-on-write: both grids copy a row's tiles before mutating one,
+        so a clone costs one pointer copy per cell and a lock afterwards
+        only copies the rows it moves or merges.
+        """
+        grid = GameGrid.__new__(GameGrid)
+        grid.__dict__.update(self.__dict__)
+        grid.tile_matrix   = self.tile_matrix.copy()
+        grid.values        = self.values.copy()
+        grid._rows         = list(self._rows)
+        grid._dirty_rows   = set(self._dirty_rows)
+        grid.row_counts    = list(self.row_counts)
+        grid._pairs        = [set(p) for p in self._pairs]
+        grid._dirty_cols   = dict(self._dirty_cols)
+        grid.merged_values = list(self.merged_values)
+        self._shared       = set(range(self.grid_height))
+        grid._shared       = set(self._shared)
+        if self.current_tetromino is not None:
+            grid.current_tetromino = self.current_tetromino.clone()
+        return grid
+
+    # ─── Cached board queries ─────────────────────────────────────────────
+    def landing_table(self):
+        """
+        column_heights() cached in the board index by Zobrist hash, for
+        search and simulation, which revisit the same boards. The live
+        game sees a new board after every lock, so it should call
+        column_heights() directly rather than fill the index.
+        """
+        key = (self.grid_height, self.grid_width, self.zobrist)
+        return self.index.get_or_compute('landing', key, self.column_heights)
+
+    def column_heights(self):
+        """Stack height of each column (one above its highest tile)."""
+        occupied = self.values != 0
+        top = self.grid_height - np.argmax(occupied[::-1], axis=0)
+        return tuple(np.where(occupied.any(axis=0), top, 0).tolist())
+
+    def placements(self, tetromino):
+        """
+        Straight-down drops of the tetromino in its current orientation:
+        [(col, row)] giving the bottom-left cell of each resting position
+        that fits inside the grid. Cached by board hash and shape.
+        """
+        tiles = tetromino.tile_matrix
+        cells = [t.position for t in tiles[tiles != None]]
+        x0, y0 = min(p.x for p in cells), min(p.y for p in cells)
+        shape = tuple(sorted((p.x - x0, p.y - y0) for p in cells))
+        key = (self.grid_height, self.grid_width, self.zobrist, shape)
+        return self.index.get_or_compute(
+            'placements', key, lambda: self._placements(shape))
+
+    def _placements(self, shape):
+        heights = self.landing_table()
+        width  = max(dx for dx, dy in shape) + 1
+        height = max(dy for dx, dy in shape) + 1
+        result = []
+        for col in range(self.grid_width - width + 1):
+            row = max(heights[col + dx] - dy for dx, dy in shape)
+            if row + height <= self.grid_height:
+                result.append((col, row))
+        return result
+
+    @staticmethod
+    def _make_tile(row, col, value):
+        tile = Tile(Point(col, row))
+        tile.number = 1 << value
+        tile.background_color = tile.color_generator()
+        return tile
+
     def update_grid(self, tiles_to_place):
         """
         Place tiles from a tetromino into the grid;
@@ -91,75 +285,176 @@ class GameGrid:
                             self.game_over = True
                         else:
                             # Place tile
-                            self.tile_matrix[pos.y][pos.x] = tile
+                            self._set(pos.y, pos.x, tile)
         return self.game_over
 
+    def lock_tetromino(self, tetromino, clear_rows=True, merge_tiles=True,
+                       merge_mode='vertical'):
+        """
+        Place a landed tetromino, then clear the rows and merge the columns
+        it touched. Returns (game_over, lines_cleared, merges).
+        """
+        tiles = tetromino.tile_matrix
+        self.merged_values = []
+        game_over = self.update_grid(tiles)
+        placed = [t.position for t in tiles[tiles != None]]
+        if merge_mode != 'vertical':
+            if merge_mode not in MERGE_MODES:
+                raise ValueError(f"Unknown merge mode: {merge_mode}")
+            lines, merges = self.resolve(placed, merge_mode == 'full',
+                                         clear_rows, merge_tiles)
+            return game_over, lines, merges
+        lines = merges = 0
+        if clear_rows:
+            lines = self.rowCheck({p.y for p in placed})
+        else:
+            self.applyGravity()
+        if merge_tiles:
+            merges = self.sumCheck({p.x for p in placed}, tetromino)
+        return game_over, lines, merges
+
+    def resolve(self, placed, full=False, clear_rows=True, merge_tiles=True):
+        """
+        Post-lock resolution for the horizontal and full merge modes. The
+        vertical rule is the original one: full rows are cleared, then
+        sumCheck merges the columns the piece touched (every column if
+        full). A horizontal pass then merges one round of equal left/right
+        pairs; unless full, a pair needs one cell that changed during this
+        lock. The three repeat, sumCheck on the columns the previous pass
+        changed, until a pass clears nothing and merges no pair. rowCheck
+        walks its rows against indices that go stale once a lower row is
+        cleared, so the rows still full are checked again on every pass.
+        Returns (lines_cleared, merges).
+        """
+        start = self.values.copy()
+        lines = merges = 0
+        if not clear_rows:
+            self.applyGravity()
+        touched = self.values != start
+        for p in placed:
+            if self.is_inside(p.y, p.x):
+                touched[p.y, p.x] = True
+        columns = range(self.grid_width) if full else {p.x for p in placed}
+        while True:
+            before = self.values.copy()
+            cleared = merged = 0
+            if clear_rows:
+                cleared = self.rowCheck(
+                    [y for y, n in enumerate(self.row_counts)
+                     if n == self.grid_width])
+                lines += cleared
+            if merge_tiles:
+                touched |= self.values != before
+                merges += self.sumCheck(columns, None)
+                touched |= self.values != before
+                merged = self._merge_horizontal(None if full else touched)
+                merges += merged
+            if not cleared and not merged:
+                return lines, merges
+            changed = self.values != before
+            touched |= changed
+            if not full:
+                columns = np.flatnonzero(changed.any(axis=0)).tolist()
+
+    def _merge_horizontal(self, touched=None):
+        """
+        Merge one round of equal left/right pairs, found by a shifted-array
+        comparison: lowest row first, then left to right, each cell in at
+        most one merge. The left tile keeps the doubled number; gravity
+        then drops the tiles above the removed ones. With a touched mask,
+        only pairs with a touched cell merge. Returns the number of merges.
+        """
+        v = self.values
+        horz = (v[:, :-1] != 0) & (v[:, :-1] == v[:, 1:])  # (y, x) ~ (y, x+1)
+        if touched is not None:
+            horz &= touched[:, :-1] | touched[:, 1:]
+        merges = 0
+        last = None                    # right cell of the previous merge
+        for y, x in zip(*(a.tolist() for a in np.nonzero(horz))):
+            if (y, x) == last:
+                continue
+            keep = self._own(y, x)
+            keep.number *= 2
+            self.score  += keep.number
+            self.merged_values.append(keep.number)
+            keep.background_color = keep.color_generator()
+            self._set(y, x, keep)
+            self._set(y, x + 1, None)
+            last = (y, x + 1)
+            merges += 1
+        if merges:
+            self.applyGravity()
+        return merges
+
     def sumCheck(self, columnSet, current_tetromino):
         """
         Merge vertically same-numbered tiles (2048 rules) and update score.
         After merging, apply gravity so no tile floats.
+        Returns the number of merges.
         """
+        merges = 0
         for x in columnSet:
-            merged = True
-            while merged:
-                merged = False
-                for y in range(self.grid_height - 1):
-                    bottom = self.tile_matrix[y][x]
-                    top    = self.tile_matrix[y+1][x]
-                    if bottom and top and bottom.number == top.number:
-                        # Merge into bottom
-                        bottom.number *= 2
-                        self.score   += bottom.number
-                        bottom.background_color = bottom.color_generator()
-                        # Remove top
-                        self.tile_matrix[y+1][x] = None
-                        # Shift above tiles down by one
-                        for yy in range(y+2, self.grid_height):
-                            t = self.tile_matrix[yy][x]
-                            if t:
-                                t.move(0, -1)
-                                self.tile_matrix[yy-1][x] = t
-                                self.tile_matrix[yy][x]   = None
-                        merged = True
-                        break
+            # the lowest equal pair is merged first, as a bottom-up scan would
+            pairs = self._pairs[x]
+            while pairs:
+                y = min(pairs)
+                bottom = self._own(y, x)
+                # Merge into bottom
+                bottom.number *= 2
+                self.score   += bottom.number
+                self.merged_values.append(bottom.number)
+                bottom.background_color = bottom.color_generator()
+                self._set(y, x, bottom)
+                # Remove top
+                self._set(y+1, x, None)
+                # Shift above tiles down by one
+                for yy in range(y+2, self.grid_height):
+                    if self.tile_matrix[yy][x]:
+                        self._drop(yy, x)
+                merges += 1
         # After all merges, drop any floating tiles
         self.applyGravity()
+        return merges
 
     def rowCheck(self, rowSet):
         """
         Remove full rows, update score, and drop above tiles.
         Then apply gravity to clear any floating tiles.
+        Returns the number of rows cleared.
         """
+        cleared = 0
         validRows = sorted(y for y in rowSet if 0 <= y < self.grid_height)
         for y in validRows:
-            if not all(self.tile_matrix[y][x] is not None for x in range(self.grid_width)):
+            if self.row_counts[y] != self.grid_width:
                 continue
             # Clear row and accumulate score
+            cleared += 1
             for x in range(self.grid_width):
                 self.score += self.tile_matrix[y][x].number
-                self.tile_matrix[y][x] = None
+                self._set(y, x, None)
             # Drop everything above
             for yy in range(y+1, self.grid_height):
                 for x in range(self.grid_width):
-                    t = self.tile_matrix[yy][x]
-                    if t:
-                        t.move(0, -1)
-                        self.tile_matrix[yy-1][x] = t
-                        self.tile_matrix[yy][x]   = None
+                    if self.tile_matrix[yy][x]:
+                        self._drop(yy, x)
         # Final gravity pass
         self.applyGravity()
+        return cleared
 
     def applyGravity(self):
         """
         Drop all floating tiles until they land on another tile or bottom.
+        Only columns written since the last pass can hold floating tiles,
+        and only from their lowest written row up.
         """
-        for x in range(self.grid_width):
-            for y in range(1, self.grid_height):
+        dirty = self._dirty_cols
+        for x in sorted(dirty):
+            for y in range(max(1, dirty[x]), self.grid_height):
                 tile = self.tile_matrix[y][x]
                 if tile and self.tile_matrix[y-1][x] is None:
                     ny = y
                     while ny > 0 and self.tile_matrix[ny-1][x] is None:
-                        tile.move(0, -1)
-                        self.tile_matrix[ny-1][x] = tile
-                        self.tile_matrix[ny][x]   = None
                         ny -= 1
+                    self._drop(y, x, y - ny)
+        # the board is stable again
+        self._dirty_cols = {}
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+game_history.py
+
+SQLite-backed leaderboard and game-history store. Every finished game is
+one row (seed, score, max tile, lines, duration, replay pointer). Human
+games store their wall-clock length in duration_s and simulations their
+step count in steps; the other column stays NULL. Writes are buffered
+and flushed in bulk transactions, and the table is indexed for top-N,
+per-player, per-seed and date-range queries.
+"""
+import sqlite3
+import time
+
+from resources import data_path
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS games (
+    id        INTEGER PRIMARY KEY,
+    played_at REAL    NOT NULL,     -- unix time the game finished
+    player    TEXT,                 -- 'human' or a policy name
+    seed      INTEGER,
+    score     INTEGER NOT NULL,
+    max_tile  INTEGER NOT NULL,
+    lines     INTEGER NOT NULL,
+    duration_s REAL,                -- wall-clock seconds (human games)
+    steps     INTEGER,              -- environment steps (simulations)
+    replay    TEXT                  -- path/URI of a replay, if recorded
+);
+CREATE INDEX IF NOT EXISTS games_score     ON games (score DESC);
+CREATE INDEX IF NOT EXISTS games_player    ON games (player, score DESC);
+CREATE INDEX IF NOT EXISTS games_seed      ON games (seed, score DESC);
+CREATE INDEX IF NOT EXISTS games_played_at ON games (played_at);
+'''
+
+_COLUMNS = ('played_at', 'player', 'seed', 'score', 'max_tile', 'lines',
+            'duration_s', 'steps', 'replay')
+_INSERT = (f"INSERT INTO games ({', '.join(_COLUMNS)}) "
+           f"VALUES ({', '.join('?' * len(_COLUMNS))})")
+
+# Databases from before the split have a single `duration` column holding
+# seconds for human games and steps for everything else
+_MIGRATE_DURATION = f'''
+BEGIN;
+DROP INDEX IF EXISTS games_score;
+DROP INDEX IF EXISTS games_seed;
+DROP INDEX IF EXISTS games_played_at;
+ALTER TABLE games RENAME TO games_old;
+{_SCHEMA}
+INSERT INTO games (id, {', '.join(_COLUMNS)})
+SELECT id, played_at, player, seed, score, max_tile, lines,
+       CASE WHEN player IS NULL OR player = 'human' THEN duration END,
+       CASE WHEN player IS NULL OR player = 'human' THEN NULL
+            ELSE CAST(duration AS INTEGER) END,
+       replay
+FROM games_old;
+DROP TABLE games_old;
+COMMIT;
+'''
+
+
+class HistoryStore:
+    """Buffered writer and indexed reader over the games table."""
+    def __init__(self, path=None, batch_size=1000):
+        self.path = path or data_path('history.db')
+        self.batch_size = batch_size
+        self._pending = []
+        self._conn = sqlite3.connect(self.path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        columns = {r['name'] for r in
+                   self._conn.execute('PRAGMA table_info(games)')}
+        if 'duration' in columns:
+            self._conn.executescript(_MIGRATE_DURATION)
+        self._conn.executescript(_SCHEMA)
+
+    # ─── Writes ───────────────────────────────────────────────────────────
+    def record(self, score, max_tile, lines, duration_s=None, steps=None,
+               seed=None, replay=None, player=None, played_at=None):
+        """
+        Queue one finished game; flushed every batch_size games. Pass
+        duration_s for a game played in real time, steps for a simulated one.
+        """
+        self._pending.append((time.time() if played_at is None else played_at,
+                              player, seed, score, max_tile, lines, duration_s,
+                              steps, replay))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def record_many(self, games):
+        """Queue many games given as dicts with record()'s keyword names."""
+        for g in games:
+            self.record(**g)
+
+    def flush(self):
+        """Write every queued game in a single transaction."""
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany(_INSERT, self._pending)
+        self._pending.clear()
+
+    # ─── Queries ──────────────────────────────────────────────────────────
+    def top(self, n=10, player=None):
+        """Best n games by score, optionally for one player/policy."""
+        self.flush()
+        if player is None:
+            sql, args = 'SELECT * FROM games ORDER BY score DESC LIMIT ?', (n,)
+        else:
+            sql = ('SELECT * FROM games WHERE player = ? '
+                   'ORDER BY score DESC LIMIT ?')
+            args = (player, n)
+        return [dict(r) for r in self._conn.execute(sql, args)]
+
+    def by_seed(self, seed, n=None):
+        """Games played on one seed, best first."""
+        self.flush()
+        sql = 'SELECT * FROM games WHERE seed = ? ORDER BY score DESC'
+        args = (seed,)
+        if n is not None:
+            sql += ' LIMIT ?'
+            args += (n,)
+        return [dict(r) for r in self._conn.execute(sql, args)]
+
+    def between(self, start, end):
+        """Games finished in [start, end) (unix times), oldest first."""
+        self.flush()
+        return [dict(r) for r in self._conn.execute(
+            'SELECT * FROM games WHERE played_at >= ? AND played_at < ? '
+            'ORDER BY played_at', (start, end))]
+
+    def count(self):
+        self.flush()
+        return self._conn.execute('SELECT COUNT(*) FROM games').fetchone()[0]
+
+    # ─── Lifecycle ────────────────────────────────────────────────────────
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+game_server.py
+
+Local multiplayer/spectator mode. An asyncio server runs one authoritative
+game with the normal rules and streams it over a localhost socket as
+newline-delimited JSON: a keyframe (the whole board) on join and every
+KEYFRAME_EVERY locks, and one delta per lock in between holding the
+changed cells, merges, cleared lines and score. One connection may play,
+any number may watch; the first line a client sends is its hello, a
+JSON object such as {"role": "player"}, and anything else is answered
+with an error message before the connection is closed. Every message
+is encoded once and the same bytes are written to all clients, so
+spectators cost no per-client board copy.
+
+    python game_server.py serve [--port 2048] [--seed 1]
+    python game_server.py watch [--port 2048] [--messages 100]
+"""
+import argparse
+import asyncio
+import json
+import random
+
+from board_state import BoardState
+from game_config import GameConfig
+from levels      import LevelProgress
+from tetris_env  import TetrisEnv, NOOP, LEFT, RIGHT, DOWN, HARD_DROP
+
+DEFAULT_PORT   = 2048
+KEYFRAME_EVERY = 50          # messages between keyframes
+MAX_BUFFER     = 256 * 1024  # bytes queued for a client before it is resynced
+RESTART_DELAY  = 2.0         # seconds between game over and the next game
+
+_INPUTS = {'left': LEFT, 'right': RIGHT, 'down': DOWN, 'drop': HARD_DROP}
+
+# Sent before closing a connection whose first line is not a JSON object
+BAD_HELLO = {'type': 'error', 'message': 'hello must be a JSON object'}
+
+
+def _encode(msg):
+    return (json.dumps(msg, separators=(',', ':')) + '\n').encode()
+
+
+def keyframe_message(state, seq, game):
+    return {'type': 'keyframe', 'seq': seq, 'game': game,
+            'h': state.height, 'w': state.width,
+            'rows': [row.hex() for row in state.rows],
+            'score': state.score, 'game_over': state.game_over}
+
+
+class _Client:
+    __slots__ = ('writer', 'stale')
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.stale  = True   # needs a keyframe before any delta
+
+
+class GameServer:
+    """Authoritative game plus the set of connected clients."""
+    def __init__(self, config=None, seed=None, host='127.0.0.1',
+                 port=DEFAULT_PORT):
+        self.config  = config or GameConfig()
+        self.host    = host
+        self.port    = port
+        self.seeds   = random.Random(seed)
+        self.env     = TetrisEnv(self.config)
+        self.clients = set()
+        self.player  = None
+        self.seq     = 0
+        self.game    = 0
+        self._server = None
+        self._keyframe = None    # (seq, encoded bytes) of the current state
+
+    # ─── Game ─────────────────────────────────────────────────────────────
+    def _new_game(self):
+        self.game += 1
+        self.env.reset(self.seeds.getrandbits(32))
+        self.progress = LevelProgress(self.config)
+        self.state = self.env.grid.snapshot()
+        self._publish_keyframe()
+
+    def _apply(self, action, gravity):
+        """Run one input or gravity step and stream the lock it causes."""
+        locks = self.env.locks
+        if gravity:
+            _, _, done, info = self.env.step(action)
+        else:
+            _, _, done, info = self.env.act(action)
+        if self.env.locks == locks:
+            return
+        self.progress.add(info['lines'], info['merges'])
+        state = self.env.grid.snapshot()
+        self.seq += 1
+        delta = {'type': 'delta', 'seq': self.seq, 'game': self.game,
+                 'cells': state.diff(self.state),
+                 'merges': info['merges'], 'lines': info['lines'],
+                 'score': state.score, 'game_over': done}
+        self.state = state
+        self._broadcast(_encode(delta))
+        # keyframes repeat the state the delta just produced, which lets
+        # clients verify their reconstruction
+        if self.seq % KEYFRAME_EVERY == 0 or done:
+            self._publish_keyframe()
+
+    async def _gravity_loop(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            self._new_game()
+            while not self.env.done:
+                next_tick += self.progress.timings.gravity_ms / 1000
+                await asyncio.sleep(max(0.0, next_tick - loop.time()))
+                self._apply(NOOP, gravity=True)
+            await asyncio.sleep(RESTART_DELAY)
+            next_tick = loop.time()
+
+    # ─── Streaming ────────────────────────────────────────────────────────
+    def _current_keyframe(self):
+        """Encoded keyframe of the current state, built once per seq."""
+        if self._keyframe is None or self._keyframe[0] != self.seq:
+            data = _encode(keyframe_message(self.state, self.seq, self.game))
+            self._keyframe = (self.seq, data)
+        return self._keyframe[1]
+
+    def _publish_keyframe(self):
+        self.seq += 1
+        for client in self.clients:
+            client.stale = True
+        self._broadcast(None)
+
+    def _broadcast(self, data):
+        """Write data to every client; stale ones get the keyframe instead."""
+        dead = []
+        for client in self.clients:
+            transport = client.writer.transport
+            if transport.is_closing():
+                dead.append(client)
+                continue
+            if transport.get_write_buffer_size() > MAX_BUFFER:
+                client.stale = True     # too slow: skip deltas, resync later
+                continue
+            if client.stale:
+                client.writer.write(self._current_keyframe())
+                client.stale = False
+            elif data is not None:
+                client.writer.write(data)
+        for client in dead:
+            self.clients.discard(client)
+
+    async def _handle(self, reader, writer):
+        client = _Client(writer)
+        try:
+            try:
+                hello = json.loads(await reader.readline() or b'{}')
+            except ValueError:
+                hello = None
+            if not isinstance(hello, dict):
+                writer.write(_encode(BAD_HELLO))
+                await writer.drain()
+                return
+            role = 'spectator'
+            if hello.get('role') == 'player' and self.player is None:
+                role, self.player = 'player', client
+            writer.write(_encode({'type': 'welcome', 'role': role}))
+            self.clients.add(client)
+            if self.game:
+                writer.write(self._current_keyframe())
+                client.stale = False
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if client is not self.player or self.env.done:
+                    continue
+                try:
+                    action = _INPUTS.get(json.loads(line).get('input'))
+                except (ValueError, AttributeError):
+                    continue
+                if action is not None:
+                    self._apply(action, gravity=False)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self.clients.discard(client)
+            if self.player is client:
+                self.player = None
+            writer.close()
+
+    # ─── Lifecycle ────────────────────────────────────────────────────────
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host,
+                                                  self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._task = asyncio.create_task(self._gravity_loop())
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        self._task.cancel()
+        self._server.close()
+        for client in list(self.clients):
+            client.writer.close()
+        await asyncio.sleep(0)      # let the handlers see EOF and finish
+        await self._server.wait_closed()
+
+
+# ─── Client side ────────────────────────────────────────────────────────────
+class StreamReplayer:
+    """
+    Rebuilds the board from the message stream. Each keyframe after the
+    first is checked against the board reconstructed from the deltas.
+    """
+    def __init__(self):
+        self.state      = None
+        self.game       = None
+        self.seq        = None
+        self.verified   = 0    # keyframes that matched the reconstruction
+        self.mismatches = 0
+        self.gaps       = 0    # deltas skipped because of a sequence gap
+
+    def apply(self, msg):
+        kind = msg.get('type')
+        if kind == 'keyframe':
+            state = BoardState([bytes.fromhex(r) for r in msg['rows']],
+                               msg['w'], msg['score'], msg['game_over'])
+            if self.state is not None and self.game == msg['game'] \
+                    and self.seq == msg['seq'] - 1:
+                if self.state.rows == state.rows and \
+                        self.state.score == state.score:
+                    self.verified += 1
+                else:
+                    self.mismatches += 1
+            self.state, self.game, self.seq = state, msg['game'], msg['seq']
+        elif kind == 'delta':
+            if self.state is None or msg['game'] != self.game or \
+                    msg['seq'] != self.seq + 1:
+                self.gaps += 1
+                self.state = None   # wait for the next keyframe
+                return
+            for y, x, v in msg['cells']:
+                self.state.set(y, x, v)
+            self.state.score = msg['score']
+            self.state.game_over = msg['game_over']
+            self.seq = msg['seq']
+
+
+async def watch(host='127.0.0.1', port=DEFAULT_PORT, role='spectator',
+                messages=100, inputs=()):
+    """Connect, optionally send inputs, and replay `messages` messages."""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(_encode({'role': role}))
+    for key in inputs:
+        writer.write(_encode({'input': key}))
+    replayer = StreamReplayer()
+    try:
+        for _ in range(messages):
+            line = await reader.readline()
+            if not line:
+                break
+            replayer.apply(json.loads(line))
+    finally:
+        writer.close()
+    return replayer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tetris 2048 game server')
+    parser.add_argument('mode', choices=('serve', 'watch'))
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--messages', type=int, default=100)
+    args = parser.parse_args()
+    if args.mode == 'serve':
+        asyncio.run(GameServer(seed=args.seed, port=args.port).serve_forever())
+    else:
+        r = asyncio.run(watch(port=args.port, messages=args.messages))
+        print(f"verified={r.verified} mismatches={r.mismatches} gaps={r.gaps}")
+
+if __name__ == '__main__':
+    main()
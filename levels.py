@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+levels.py
+
+Level/speed progression and the monotonic-clock scheduler that drives
+gravity and frame pacing.
+"""
+import time
+from collections import namedtuple
+
+# Timings of one level, all in milliseconds
+Level = namedtuple('Level', 'gravity_ms soft_drop_ms lock_delay_ms')
+
+
+class LevelTable:
+    """Per-level timings built from the gravity/soft-drop/lock-delay curves."""
+    def __init__(self, config):
+        curves = (config.gravity_curve, config.soft_drop_curve,
+                  config.lock_delay_curve)
+        n = max(len(c) for c in curves)
+        # shorter curves keep their last value
+        self.levels = [Level(*(c[min(i, len(c) - 1)] for c in curves))
+                       for i in range(n)]
+
+    def __len__(self):
+        return len(self.levels)
+
+    def __getitem__(self, level):
+        return self.levels[min(level, len(self.levels) - 1)]
+
+
+class LevelProgress:
+    """Tracks lines cleared and merges; every lines_per_level lines (a
+    merge counts as 1/merges_per_line of a line) raise the level by one."""
+    def __init__(self, config):
+        self.table           = LevelTable(config)
+        self.lines_per_level = config.lines_per_level
+        self.merges_per_line = config.merges_per_line
+        self.lines  = 0
+        self.merges = 0
+
+    def add(self, lines=0, merges=0):
+        """Record a lock's clears and merges; returns True on level up."""
+        before = self.level
+        self.lines  += lines
+        self.merges += merges
+        return self.level != before
+
+    @property
+    def level(self):
+        progress = self.lines + self.merges // self.merges_per_line
+        return min(progress // self.lines_per_level, len(self.table) - 1)
+
+    @property
+    def timings(self):
+        return self.table[self.level]
+
+
+class Scheduler:
+    """
+    Fixed-rate ticker on time.monotonic(). Deadlines advance by whole
+    intervals from the previous deadline rather than from "now", so the
+    effective rate stays exact however long each frame takes to render.
+    """
+    def __init__(self, interval, now=None, max_catchup=64):
+        self.interval    = interval      # seconds
+        self.max_catchup = max_catchup   # ticks returned at most per call
+        self.reset(now)
+
+    def reset(self, now=None):
+        """Restart the phase: the first tick is one interval from now."""
+        now = time.monotonic() if now is None else now
+        self.next = now + self.interval
+
+    def set_interval(self, interval, now=None):
+        """Change the rate; a shorter interval takes effect immediately."""
+        if interval == self.interval:
+            return
+        now = time.monotonic() if now is None else now
+        self.interval = interval
+        self.next = min(self.next, now + interval)
+
+    def due(self, now=None):
+        """Number of ticks elapsed since the last call (0 if none)."""
+        now = time.monotonic() if now is None else now
+        if now < self.next:
+            return 0
+        n = int((now - self.next) // self.interval) + 1
+        self.next += n * self.interval
+        if n > self.max_catchup:
+            # far behind (e.g. window dragged): drop the backlog
+            self.next = now + self.interval
+            n = self.max_catchup
+        return n
+
+    def sleep(self):
+        """Sleep until the next deadline, then consume that tick."""
+        delay = self.next - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self.due()
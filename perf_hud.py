@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+perf_hud.py
+
+Toggleable performance overlay for the game sidebar: frame time, FPS,
+input-to-render latency, canvas item count, lock-resolution time and the
+Python allocation rate, over a rolling window. The overlay is a single
+retained canvas text item whose text is replaced a few times a second,
+so it is never redrawn with the frame. Retained items survive clear(),
+so the overlay is paused (hidden) outside of games.
+"""
+import gc
+import time
+from collections import deque
+
+import stddraw
+from color import Color
+
+WINDOW   = 2.0     # seconds of history behind each figure
+UPDATE   = 0.5     # seconds between overlay refreshes
+LATENCY_SAMPLES = 32   # most recent input events averaged
+
+
+def _gc_allocs():
+    """
+    Container allocations (net of frees) since start, from the GC
+    counters: every gen-0 collection stands for `threshold` allocations.
+    Far cheaper than tracemalloc, which slows every allocation.
+    """
+    return (gc.get_stats()[0]['collections'] * gc.get_threshold()[0]
+            + gc.get_count()[0])
+
+
+def _ms(seconds):
+    return seconds * 1000
+
+
+class PerfHUD:
+    """Rolling frame/lock statistics rendered into one retained text item."""
+    def __init__(self, x, y, visible=False, color=Color(119,110,101),
+                 font_size=9):
+        self.x, self.y   = x, y
+        self.color       = color
+        self.font_size   = font_size
+        self.visible     = False      # toggled on by the player
+        self.paused      = True       # no game running: keep it hidden
+        self.frames      = deque()    # (end time, frame work seconds)
+        self.locks       = deque()    # (time, lock resolution seconds)
+        self._item       = None
+        self._cost       = 0.0        # seconds spent refreshing since last one
+        self._last       = time.perf_counter()
+        self._allocs     = _gc_allocs()
+        if visible:
+            self.toggle()
+
+    def toggle(self):
+        self.visible = not self.visible
+        self._show()
+
+    def resume(self):
+        """A game starts: show the overlay again if it is toggled on."""
+        self.paused = False
+        self.frames.clear()
+        self.locks.clear()
+        self._show()
+
+    def pause(self):
+        """The game ended: hide the overlay, keeping its toggle state."""
+        self.paused = True
+        self._show()
+
+    def _show(self):
+        shown = self.visible and not self.paused
+        if self._item is None:
+            if not shown:
+                return
+            self._item = stddraw.retainedText(self.x, self.y, c=self.color,
+                                              family='Courier',
+                                              size=self.font_size)
+        stddraw.setRetainedVisible(self._item, shown)
+        self._last   = time.perf_counter()
+        self._allocs = _gc_allocs()
+        self._cost   = 0.0
+
+    # ─── Samples ──────────────────────────────────────────────────────────
+    def frame(self, work):
+        """
+        Record one redrawn frame that took `work` seconds before pacing;
+        loop ticks that drew nothing are not frames and are not recorded.
+        """
+        now = time.perf_counter()
+        self.frames.append((now, work))
+        self._trim(self.frames, now)
+
+    def lock(self, seconds):
+        now = time.perf_counter()
+        self.locks.append((now, seconds))
+        self._trim(self.locks, now)
+
+    @staticmethod
+    def _trim(samples, now):
+        while samples and samples[0][0] < now - WINDOW:
+            samples.popleft()
+
+    # ─── Overlay ──────────────────────────────────────────────────────────
+    def update(self):
+        """Refresh the overlay text when due; call once per frame."""
+        if not self.visible or self.paused:
+            return
+        t0 = time.perf_counter()
+        elapsed = t0 - self._last
+        if elapsed < UPDATE:
+            return
+        stddraw.setRetainedText(self._item, self._text(t0, elapsed))
+        self._allocs, self._last = _gc_allocs(), t0
+        self._cost = time.perf_counter() - t0
+
+    def _text(self, now, elapsed):
+        self._trim(self.frames, now)
+        self._trim(self.locks, now)
+        frames = [w for _, w in self.frames]
+        if frames:
+            span  = now - self.frames[0][0]
+            fps   = len(frames) / span if span > 0 else 0.0
+            mean  = sum(frames) / len(frames)
+            worst = max(frames)
+        else:
+            fps = mean = worst = 0.0
+        locks = [s for _, s in self.locks]
+        lock_mean = sum(locks) / len(locks) if locks else 0.0
+        lock_max  = max(locks) if locks else 0.0
+        lat = stddraw.inputLatencies()[-LATENCY_SAMPLES:]
+        lat_mean = sum(lat) / len(lat) if lat else 0.0
+        lat_max  = max(lat) if lat else 0.0
+        alloc_rate = (_gc_allocs() - self._allocs) / elapsed
+        # share of the last interval spent refreshing the overlay
+        cost = self._cost / elapsed * 100
+        return (f"fps   {fps:5.1f}\n"
+                f"frame {_ms(mean):4.1f}/{_ms(worst):4.1f}ms\n"
+                f"input {_ms(lat_mean):4.1f}/{_ms(lat_max):4.1f}ms\n"
+                f"lock  {_ms(lock_mean):4.1f}/{_ms(lock_max):4.1f}ms\n"
+                f"items {stddraw.itemCount():5d}\n"
+                f"alloc {alloc_rate/1000:5.1f}k/s\n"
+                f"hud   {cost:4.2f}%")
@@ -43,6 +43,12 @@ class Picture:
             # boşsa hiç bir şey yazmaz (ya da boş dosya)
             open(f, "wb").close()
 
+    def path(self):
+        """
+        path(self): kaynak dosya yolu (boş resimler için None).
+        """
+        return self._path
+
     def width(self):
         if self._path and self._w is None:
             # kullanıldığı yerde width() pek gerekli değil, 0 dönebilir
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+resources.py
+
+Locations of bundled assets and of writable data files, for a source
+checkout as well as a PyInstaller build (onedir or onefile).
+"""
+import os
+import sys
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def resource_path(name):
+    """Read-only asset shipped with the game (images, sounds)."""
+    return os.path.join(getattr(sys, '_MEIPASS', _HERE), name)
+
+
+def data_path(name):
+    """
+    Writable file kept between runs (databases, saves). A onefile build
+    unpacks into a temporary directory that is removed at exit, so frozen
+    builds keep their data next to the executable instead. The
+    TETRIS2048_DATA environment variable overrides both.
+    """
+    base = os.environ.get('TETRIS2048_DATA')
+    if not base:
+        if getattr(sys, 'frozen', False):
+            base = os.path.dirname(os.path.abspath(sys.executable))
+        else:
+            base = _HERE
+    return os.path.join(base, name)
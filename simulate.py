@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+simulate.py
+
+Headless batch simulator: plays many seeded games with a policy across
+worker processes and records the results into the history store in
+bulk transactions. With --stats every worker also adds its games to the
+shared lifetime statistics (rows cleared, merges per value, best score).
+
+    python simulate.py --games 10000 --workers 4 --policy random [--stats]
+"""
+import argparse
+import multiprocessing as mp
+import random
+import time
+
+import game_config
+from game_history import HistoryStore
+from stats_store  import StatsStore, DEFAULT_PATH as STATS_PATH
+from tetris_env   import TetrisEnv, N_ACTIONS, LEFT, RIGHT, HARD_DROP
+
+MAX_STEPS = 100_000   # safety cap on the length of one simulated game
+
+_stats = None         # per-process StatsStore when statistics are enabled
+
+
+# ─── Policies ───────────────────────────────────────────────────────────────
+# A policy is called once per step as policy(env, rng) and returns an action.
+def random_policy(env, rng):
+    return rng.randrange(N_ACTIONS)
+
+def greedy_policy(env, rng):
+    """
+    Steer the piece to the best straight drop of its current orientation:
+    stacked on equal tiles (merges), over no holes, as low as possible.
+    """
+    grid, piece = env.grid, env.current
+    tiles = piece.tile_matrix
+    cells = [(t.position.x, t.position.y, t.number.bit_length() - 1)
+             for t in tiles[tiles != None]]
+    x0 = min(c[0] for c in cells)
+    y0 = min(c[1] for c in cells)
+    bottoms = {}                       # lowest cell of each piece column
+    for x, y, v in cells:
+        if y - y0 < bottoms.get(x - x0, (grid.grid_height, 0))[0]:
+            bottoms[x - x0] = (y - y0, v)
+    heights = grid.landing_table()
+    best, target = None, x0
+    for col, row in grid.placements(piece):
+        holes = matches = 0
+        for dx, (dy, v) in bottoms.items():
+            gap = row + dy - heights[col + dx]
+            if gap:
+                holes += gap
+            elif row + dy and grid.values[row + dy - 1, col + dx] == v:
+                matches += 1
+        value = 3*matches - 2*holes - row
+        if best is None or value > best:
+            best, target = value, col
+    if target < x0:
+        return LEFT
+    if target > x0:
+        return RIGHT
+    return HARD_DROP
+
+POLICIES = {'random': random_policy, 'greedy': greedy_policy}
+
+
+# ─── Games ──────────────────────────────────────────────────────────────────
+def play(policy, seed, config=None, max_steps=MAX_STEPS, stats_path=None):
+    """Play one game; returns a history-store record as a dict."""
+    global _stats
+    if stats_path is not None and _stats is None:
+        _stats = StatsStore(stats_path)
+        # pool workers skip atexit; flush when the worker exits cleanly
+        mp.util.Finalize(_stats, _stats.flush, exitpriority=10)
+    env = TetrisEnv(config)
+    env.reset(seed)
+    rng = random.Random(seed)
+    step = POLICIES[policy]
+    lines = 0
+    merged = {}
+    for _ in range(max_steps):
+        _, _, done, info = env.step(step(env, rng))
+        lines += info['lines']
+        if info['merges']:
+            for v in env.grid.merged_values:
+                merged[v] = merged.get(v, 0) + 1
+        if done:
+            break
+    if _stats is not None:
+        _stats.add('games')
+        _stats.add('rows_cleared', lines)
+        for v, n in merged.items():
+            _stats.add(f'merges.{v}', n)
+        _stats.best('best_score', env.grid.score)
+    top = int(env.grid.values.max())
+    return {'seed': seed, 'score': env.grid.score,
+            'max_tile': 1 << top if top else 0, 'lines': lines,
+            'steps': env.steps, 'player': policy}
+
+def _play(args):
+    return play(*args)
+
+def run(policy, seeds, config=None, workers=0, stats_path=None):
+    """Yield one record per seed, computed in `workers` processes."""
+    jobs = [(policy, seed, config, MAX_STEPS, stats_path) for seed in seeds]
+    if workers <= 0:
+        yield from map(_play, jobs)
+        return
+    with mp.Pool(workers) as pool:
+        yield from pool.imap_unordered(_play, jobs, chunksize=16)
+        pool.close()
+        pool.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tetris 2048 batch simulator')
+    game_config.add_arguments(parser)
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='random')
+    parser.add_argument('--workers', type=int, default=mp.cpu_count())
+    parser.add_argument('--db', help='history database (default: history.db)')
+    parser.add_argument('--stats', nargs='?', const='', metavar='PATH',
+                        help='also update lifetime statistics '
+                             '(default: stats.db)')
+    args = parser.parse_args()
+
+    config = game_config.from_args(args)
+    seeds = range(args.first_seed, args.first_seed + args.games)
+    stats_path = None
+    if args.stats is not None:
+        stats_path = args.stats or STATS_PATH
+    t0 = time.perf_counter()
+    with HistoryStore(args.db) as store:
+        store.record_many(run(args.policy, seeds, config, args.workers,
+                              stats_path))
+        store.flush()
+        best = store.top(1, player=args.policy)
+    print(f"{args.games} games in {time.perf_counter() - t0:.1f}s; "
+          f"best score {best[0]['score'] if best else 0}")
+
+if __name__ == '__main__':
+    main()
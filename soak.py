@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+soak.py
+
+Long-session soak test: runs thousands of menu -> game -> game over
+cycles on the real canvas and checks that resident memory, open file
+descriptors, the resources stddraw tracks and the board index stay flat
+after a warm-up.
+Games are played by a simulator policy with a step cap, so a cycle takes
+a fraction of a second. Needs a display (xvfb-run works on servers).
+
+    python soak.py [--cycles 2000] [--steps 60] [--no-long-session]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+
+import stddraw
+import game_config
+from board_index import default_index
+from simulate    import POLICIES
+from tetris_env  import TetrisEnv
+from Tetris_2048 import draw_menu, draw_frame, draw_game_over, between_games
+
+
+def rss_bytes():
+    """Resident set size from /proc/self/statm (Linux)."""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def open_fds():
+    return len(os.listdir('/proc/self/fd'))
+
+
+def sample():
+    return {'rss': rss_bytes(), 'fds': open_fds(), 'index': len(default_index),
+            **stddraw.resourceCounts()}
+
+
+def frame_items():
+    counts = stddraw.resourceCounts()
+    return counts['pool_visible'] if counts['pool'] else counts['canvas_items']
+
+
+def cycle(config, env, policy, rng, steps):
+    """
+    One menu, one capped game and one game over screen; returns the
+    largest number of items any of its frames showed. The board index is
+    left as the game filled it.
+    """
+    draw_menu(config.grid_h, config.grid_w)
+    stddraw.show()
+    peak = frame_items()
+    env.reset(rng.getrandbits(32))
+    for _ in range(steps):
+        draw_frame(env.grid, env.current, env.next_piece, config.extra_cols)
+        stddraw.show()
+        peak = max(peak, frame_items())
+        _, _, done, _ = env.step(policy(env, rng))
+        if done:
+            break
+    draw_game_over(env.grid)
+    stddraw.show()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tetris 2048 soak test')
+    game_config.add_arguments(parser)
+    parser.add_argument('--cycles', type=int, default=2000)
+    parser.add_argument('--steps', type=int, default=60,
+                        help='steps per game at most')
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='random')
+    parser.add_argument('--cell', type=int, default=24)
+    parser.add_argument('--max-rss-growth', type=float, default=8.0,
+                        help='allowed RSS growth after warm-up, MiB')
+    parser.add_argument('--no-long-session', action='store_true',
+                        help='measure the default drawing mode instead')
+    args = parser.parse_args()
+
+    config = game_config.from_args(args)
+    cols = config.grid_w + config.extra_cols
+    stddraw.setCanvasSize(args.cell * cols, args.cell * config.grid_h)
+    stddraw.setXscale(-0.5, cols - 0.5)
+    stddraw.setYscale(-0.5, config.grid_h - 0.5)
+    stddraw.setLongSession(not args.no_long_session)
+
+    env = TetrisEnv(config)
+    rng = random.Random(0)
+    policy = POLICIES[args.policy]
+    warmup = max(1, args.cycles // 10)
+    report = max(1, args.cycles // 10)
+    peak = index_peak = 0
+    t0 = time.perf_counter()
+    for i in range(1, args.cycles + 1):
+        before = len(default_index)
+        peak = max(peak, cycle(config, env, policy, rng, args.steps))
+        # entries one game added, then what kiosk mode does between games
+        index_peak = max(index_peak, len(default_index) - before)
+        if not args.no_long_session:
+            between_games()
+        if i == warmup:
+            gc.collect()
+            base = sample()
+        if i % report == 0:
+            s = sample()
+            print(f"cycle {i:6d}  rss {s['rss']/2**20:7.1f} MiB  "
+                  f"fds {s['fds']:3d}  items {s['canvas_items']:5d}  "
+                  f"images {s['tk_images']:3d}  index {s['index']:6d}  "
+                  f"{(time.perf_counter() - t0)/i*1000:6.1f} ms/cycle")
+    gc.collect()
+    end = sample()
+
+    failures = []
+    growth = (end['rss'] - base['rss']) / 2**20
+    if growth > args.max_rss_growth:
+        failures.append(f"RSS grew {growth:.1f} MiB after warm-up")
+    for key in ('fds', 'tk_images', 'images', 'temp_files'):
+        if end[key] > base[key]:
+            failures.append(f"{key} grew from {base[key]} to {end[key]}")
+    if end['canvas_items'] > peak:
+        failures.append(f"{end['canvas_items']} canvas items are alive but "
+                        f"no frame drew more than {peak}")
+    if end['index'] > index_peak:
+        failures.append(f"board index holds {end['index']} entries but no "
+                        f"game added more than {index_peak}")
+    for msg in failures:
+        print('FAIL', msg)
+    if not failures:
+        print(f"flat: RSS {growth:+.1f} MiB, fds {end['fds']}, "
+              f"{end['canvas_items']} canvas items, board index "
+              f"{end['index']} entries over {args.cycles} cycles")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+stats_store.py
+
+Lifetime statistics and unlocked achievements shared by any number of
+game processes. Updates are buffered in memory and flushed periodically
+to a SQLite database in WAL mode, where each flush is one transaction of
+atomic upserts, so concurrent workers never overwrite each other.
+"""
+import atexit
+import os
+import re
+import socket
+import sqlite3
+import time
+import weakref
+
+from resources import data_path
+
+DEFAULT_PATH = data_path('stats.db')
+
+# Worker ids of older versions, one per process: "host:pid"
+_PID_WORKER = re.compile(r'(.*):\d+')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS counters (
+    name   TEXT    NOT NULL,
+    worker TEXT    NOT NULL,
+    value  INTEGER NOT NULL,
+    PRIMARY KEY (name, worker)
+);
+CREATE TABLE IF NOT EXISTS maxima (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS unlocked (
+    id          TEXT PRIMARY KEY,
+    unlocked_at REAL NOT NULL
+);
+'''
+
+
+# Open stores, flushed by one exit hook; closed or collected stores drop out
+_open_stores = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_stores():
+    for store in list(_open_stores):
+        store.flush()
+
+
+class StatsStore:
+    """
+    Buffered counters (summed), maxima (best values) and achievement
+    unlocks. Counters are kept per worker, a stable id that defaults to
+    the host name, so the table does not grow with every process started;
+    lifetime() merges all workers. Unflushed updates are written at exit
+    as long as the store is still referenced.
+    """
+    def __init__(self, path=None, flush_interval=5.0, worker=None):
+        self.path = path or DEFAULT_PATH
+        self.flush_interval = flush_interval
+        self.worker = worker or socket.gethostname()
+        self._counters = {}
+        self._maxima   = {}
+        self._unlocks  = {}
+        self._conn = None
+        self._pid  = None
+        self._last_flush = time.monotonic()
+        _open_stores.add(self)
+
+    def _connection(self):
+        # connections must not cross a fork: reopen in a new process
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=30)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(_SCHEMA)
+            self._pid = os.getpid()
+            self._fold_pid_workers()
+        return self._conn
+
+    def _fold_pid_workers(self):
+        """Merge per-process counter rows of older versions into their host."""
+        conn = self._conn
+        workers = [w for (w,) in conn.execute(
+            'SELECT DISTINCT worker FROM counters')
+            if _PID_WORKER.fullmatch(w)]
+        with conn:
+            for w in workers:
+                conn.execute(
+                    'INSERT INTO counters (name, worker, value) '
+                    'SELECT name, ?, value FROM counters WHERE worker = ? '
+                    'ON CONFLICT (name, worker) DO UPDATE '
+                    'SET value = value + excluded.value',
+                    (_PID_WORKER.fullmatch(w).group(1), w))
+                conn.execute('DELETE FROM counters WHERE worker = ?', (w,))
+
+    # ─── Buffered updates ─────────────────────────────────────────────────
+    def add(self, name, n=1):
+        self._counters[name] = self._counters.get(name, 0) + n
+        self.maybe_flush()
+
+    def best(self, name, value):
+        if value > self._maxima.get(name, value - 1):
+            self._maxima[name] = value
+        self.maybe_flush()
+
+    def unlock(self, achievement_id):
+        self._unlocks.setdefault(achievement_id, time.time())
+
+    def maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write every buffered update in one transaction."""
+        self._last_flush = time.monotonic()
+        if not (self._counters or self._maxima or self._unlocks):
+            return
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                'INSERT INTO counters (name, worker, value) VALUES (?, ?, ?) '
+                'ON CONFLICT (name, worker) DO UPDATE '
+                'SET value = value + excluded.value',
+                [(k, self.worker, v) for k, v in self._counters.items()])
+            conn.executemany(
+                'INSERT INTO maxima (name, value) VALUES (?, ?) '
+                'ON CONFLICT (name) DO UPDATE '
+                'SET value = max(value, excluded.value)',
+                list(self._maxima.items()))
+            conn.executemany(
+                'INSERT OR IGNORE INTO unlocked (id, unlocked_at) VALUES (?, ?)',
+                list(self._unlocks.items()))
+        self._counters.clear()
+        self._maxima.clear()
+        self._unlocks.clear()
+
+    # ─── Merged views ─────────────────────────────────────────────────────
+    def lifetime(self):
+        """Counters summed over all workers plus maxima, including unflushed."""
+        conn = self._connection()
+        totals = dict(conn.execute(
+            'SELECT name, SUM(value) FROM counters GROUP BY name'))
+        for k, v in self._counters.items():
+            totals[k] = totals.get(k, 0) + v
+        for k, v in conn.execute('SELECT name, value FROM maxima'):
+            totals[k] = max(v, self._maxima.get(k, v))
+        for k, v in self._maxima.items():
+            totals.setdefault(k, v)
+        return totals
+
+    def unlocked_ids(self):
+        rows = self._connection().execute('SELECT id FROM unlocked')
+        return {r[0] for r in rows} | set(self._unlocks)
+
+    def close(self):
+        self.flush()
+        _open_stores.discard(self)
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
@@ -4,14 +4,18 @@ stddraw.py
 
 Tkinter tabanlı, orijinal pygame’siz stddraw API implementasyonu.
 """
-import tkinter as tk
+import os
 import tempfile
 import time
 import color
 import string
+import numpy as np
+from collections import deque, OrderedDict
 
 # Varsayılan sabitler
 _DEFAULT_PEN_RADIUS = 1.0
+_KEY_QUEUE_MAX = 256    # en fazla bekleyen tuş olayı (eskiler düşer)
+_RETAINED = "retained"  # clear() ile silinmeyen öğelerin etiketi
 
 # Renk sabitleri (color.py içinden)
 from color import (
@@ -20,45 +24,108 @@ from color import (
     DARK_BLUE, VIOLET, BOOK_BLUE, BOOK_LIGHT_BLUE, BOOK_RED
 )
 
+_hex_cache = {}         # (r, g, b) → '#rrggbb' önbelleği
+
 def _hex(c):
     """color.Color → '#rrggbb' dizgesi."""
-    return f"#{c.getRed():02x}{c.getGreen():02x}{c.getBlue():02x}"
+    key = (c.getRed(), c.getGreen(), c.getBlue())
+    h = _hex_cache.get(key)
+    if h is None:
+        h = _hex_cache[key] = "#%02x%02x%02x" % key
+    return h
 
 # Global durum
-_width, _height = 512, 512
+_width, _height = 512, 512      # tuvalin gerçek piksel boyutu
+_base_w, _base_h = 512, 512     # setCanvasSize ile istenen mantıksal boyut
 _xmin, _xmax = 0.0, 1.0
 _ymin, _ymax = 0.0, 1.0
+_dpi_scale = 1.0                # HiDPI çarpanı
+_px = 1.0                       # kalem/yazı çarpanı (HiDPI × pencere ölçeği)
+# Dünya → ekran afin dönüşümü: sx = _ax*x + _bx, sy = _ay*y + _by.
+# Yalnızca ölçek veya tuval boyutu değiştiğinde yeniden hesaplanır.
+_ax, _bx = 512.0, 0.0
+_ay, _by = -512.0, 512.0
 _pen_color = BLACK
 _pen_radius = _DEFAULT_PEN_RADIUS
 _font_family = "Sans"
 _font_size = 12
 _root = None
 _canvas = None
-_photo_images = []      # PhotoImage referanslarını saklamak için
-_key_queue = []         # tuş kuyruklama
+tk = None               # tkinter; ilk pencere açılırken yüklenir (başsız kullanım için)
+_image_cache = OrderedDict()   # dosya yolu / Picture → PhotoImage (LRU)
+_image_cache_max = 64
+_temp_files = 0         # picture() için oluşturulmuş, henüz silinmemiş dosyalar
+_key_queue = deque(maxlen=_KEY_QUEUE_MAX)  # (tuş, zaman) olay kuyruğu
+_held = {}              # basılı tuş → [basılma zamanı, sonraki tekrar zamanı]
+_released = {}          # tuş → (Tk olay zamanı, basılı kaydı); X11 tekrarları için
+_repeat_keys = frozenset()
+_das, _arr = None, None # otomatik kaydırma gecikmesi / tekrar aralığı (sn)
+_unrendered = []        # okunmuş ama henüz ekrana yansımamış olay zamanları
+_input_latency = deque(maxlen=256)
 _mouse_pressed = False
 _mouse_x = mouse_y = 0
 
 # ─── Başlatma ve Olay bağlama ────────────────────────────────────────────
 def _init():
-    global _root, _canvas
+    global _root, _canvas, tk
     if _root:
         return
+    import tkinter as tk
     _root = tk.Tk()
     _root.title("stddraw")
     _canvas = tk.Canvas(
         _root,
         width  = _width,
         height = _height,
-        bg     = _hex(WHITE)
+        bg     = _hex(WHITE),
+        highlightthickness = 0
     )
-    _canvas.pack()
+    _canvas.pack(fill=tk.BOTH, expand=True)
+    _canvas.bind("<Configure>", _on_resize)
     _root.bind("<Key>", _on_key)
+    _root.bind("<KeyRelease>", _on_key_release)
+    _root.bind("<FocusOut>", _on_focus_out)
     _root.bind("<Button-1>", _on_click)
     _root.bind("<ButtonRelease-1>", _on_release)
 
 def _on_key(ev):
-    _key_queue.append(ev.keysym.lower())
+    key = ev.keysym.lower()
+    if _das is not None:
+        if key in _held:
+            return          # işletim sistemi tekrarı; DAS/ARR kendimiz üretir
+        rel = _released.pop(key, None)
+        if rel is not None and rel[0] == ev.time and rel[1] is not None:
+            _held[key] = rel[1]   # X11: aynı anda bırak+bas = tekrar
+            return
+        now = time.monotonic()
+        _held[key] = [now, now + _das if key in _repeat_keys else None]
+    _key_queue.append((key, time.monotonic()))
+
+def _on_key_release(ev):
+    key = ev.keysym.lower()
+    _released[key] = (ev.time, _held.pop(key, None))
+
+def _on_focus_out(ev):
+    # odak başka penceredeyken bırakılan tuşların KeyRelease'i gelmez;
+    # basılı sayılıp sonsuza dek tekrar etmesinler
+    _held.clear()
+    _released.clear()
+
+def _poll_repeats():
+    """
+    Basılı tutulan tuşlar için DAS/ARR tekrar olaylarını üretir. Her
+    çağrıda tuş başına en çok bir tekrar: kare takılırsa kaçan tekrarlar
+    toplu gönderilmez, zamanlayıcı şimdiye kaydırılır.
+    """
+    if not _held:
+        return
+    now = time.monotonic()
+    for key, rec in _held.items():
+        if rec[1] is not None and rec[1] <= now:
+            _key_queue.append((key, rec[1]))
+            rec[1] += _arr
+            if rec[1] <= now:
+                rec[1] = now + _arr
 
 def _on_click(ev):
     global _mouse_pressed, _mouse_x, _mouse_y
@@ -69,31 +136,81 @@ def _on_release(ev):
     global _mouse_pressed
     _mouse_pressed = False
 
+def _on_resize(ev):
+    """Pencere boyutu değişince mevcut öğeleri yeniden çizmeden ölçekler."""
+    global _width, _height
+    if (ev.width, ev.height) == (_width, _height) or ev.width < 2 or ev.height < 2:
+        return
+    _canvas.scale("all", 0, 0, ev.width/_width, ev.height/_height)
+    _width, _height = ev.width, ev.height
+    _update_transform()
+
 # ─── Koordinat dönüşümleri ───────────────────────────────────────────────
+def _update_transform():
+    global _ax, _bx, _ay, _by, _px
+    _ax = _width/(_xmax - _xmin)
+    _bx = -_xmin*_ax
+    _ay = -_height/(_ymax - _ymin)
+    _by = _height - _ymin*_ay
+    _px = min(_width/_base_w, _height/_base_h)
+
 def _to_screen(x, y):
-    sx = (x - _xmin)/(_xmax - _xmin) * _width
-    sy = _height - (y - _ymin)/(_ymax - _ymin) * _height
+    return _ax*x + _bx, _ay*y + _by
+
+def _to_screen_array(xs, ys):
+    """Koordinat dizilerini tek vektörel geçişte ekran uzayına çevirir."""
+    sx = np.asarray(xs, dtype=float)*_ax + _bx
+    sy = np.asarray(ys, dtype=float)*_ay + _by
     return sx, sy
 
 def _to_world(sx, sy):
-    x = sx/_width*(_xmax - _xmin) + _xmin
-    y = (_height - sy)/_height*(_ymax - _ymin) + _ymin
-    return x, y
+    return (sx - _bx)/_ax, (sy - _by)/_ay
+
+def _font(bold=False):
+    size = max(1, round(_font_size*_px))
+    return (_font_family, size, "bold") if bold else (_font_family, size)
 
 # ─── Ölçek ve Boyut ──────────────────────────────────────────────────────
 def setCanvasSize(w, h):
-    global _width, _height
-    _width, _height = w, h
+    """Mantıksal boyut; gerçek piksel boyutu HiDPI çarpanıyla büyütülür."""
+    global _width, _height, _base_w, _base_h
+    _base_w, _base_h = w, h
+    _width, _height = round(w*_dpi_scale), round(h*_dpi_scale)
+    _update_transform()
     _init()
     _canvas.config(width=_width, height=_height)
 
+def setHiDPIScale(f=None):
+    """
+    HiDPI çarpanını ayarlar; f None ise ekranın DPI değerinden
+    (96 dpi = 1.0) hesaplanır. setCanvasSize'dan önce çağrılmalıdır.
+    """
+    global _dpi_scale
+    if f is None:
+        _init()
+        f = max(1.0, _root.winfo_fpixels("1i")/96.0)
+    _dpi_scale = float(f)
+    _update_transform()
+    return _dpi_scale
+
+def setResizable(flag=True):
+    _init()
+    _root.resizable(flag, flag)
+
+def screenSize():
+    """Ekranın piksel boyutu (genişlik, yükseklik)."""
+    _init()
+    return _root.winfo_screenwidth(), _root.winfo_screenheight()
+
 def setXscale(xmin, xmax):
     global _xmin, _xmax
     _xmin, _xmax = xmin, xmax
+    _update_transform()
 
 def setYscale(ymin, ymax):
     global _ymin, _ymax
     _ymin, _ymax = ymin, ymax
+    _update_transform()
 
 def setScale(xmin, xmax, ymin, ymax):
     setXscale(xmin, xmax)
@@ -119,7 +236,10 @@ def setFontSize(size):
 # ─── Temizleme ve Kaydetme ───────────────────────────────────────────────
 def clear(c=None):
     _init()
-    _canvas.delete("all")
+    if _pooling:
+        _next_frame()           # öğeler silinmez, yeniden kullanılır
+    else:
+        _canvas.delete("!" + _RETAINED)
     if c is not None:
         _canvas.config(bg=_hex(c))
 
@@ -127,49 +247,139 @@ def save(filename):
     _init()
     _canvas.postscript(file=filename)
 
+# ─── Öğe Havuzu ─────────────────────────────────────────────────────────
+# Uzun oturum kipinde öğeler her karede silinip yeniden oluşturulmaz: her
+# tür kendi serbest listesini tutar ve bir karede o türden çizilen n.
+# öğe, listedeki n. öğenin kimliğiyle yeniden kullanılır. Çizim sırası
+# önceki kareninkinden ayrıldığı noktadan sonra her öğe en üste alınır,
+# böylece yığın sırası korunur; karede kullanılmayan öğeler show()
+# sırasında gizlenir.
+_pooling = False
+_pool = {}              # tür -> kimlikler (o türün serbest listesi)
+_pool_used = {}         # tür -> bu karede kullanılan öğe sayısı
+_pool_shown = {}        # tür -> görünür durumdaki öğe sayısı
+_stack = []             # önceki karenin çizim sırası (alttan üste)
+_frame = []             # bu karenin çizim sırası
+_restack = False        # sıra ayrıldı: kalan öğeler en üste alınır
+# Yeniden kullanımda verilmeyen seçenekler önceki karedeki değerini
+# korumasın diye varsayılanlarına döndürülür
+_POOL_DEFAULTS = {"rectangle": {"fill": ""}, "oval": {"fill": ""}}
+
+def _create(kind, coords, **opts):
+    global _restack
+    if not _pooling:
+        return getattr(_canvas, "create_" + kind)(*coords, **opts)
+    items = _pool.setdefault(kind, [])
+    n = _pool_used.get(kind, 0)
+    if n < len(items):
+        item = items[n]
+        _canvas.coords(item, *coords)
+        if kind in _POOL_DEFAULTS:
+            opts = {**_POOL_DEFAULTS[kind], **opts}
+        if n >= _pool_shown.get(kind, 0):
+            opts["state"] = "normal"
+            _pool_shown[kind] = n + 1
+        _canvas.itemconfigure(item, **opts)
+        pos = len(_frame)
+        if not _restack and (pos >= len(_stack) or _stack[pos] != item):
+            _restack = True
+        if _restack:
+            _canvas.tag_raise(item)
+    else:
+        # yeni öğe zaten en üstte oluşur; sonrakiler de üste alınmalı
+        item = getattr(_canvas, "create_" + kind)(*coords, **opts)
+        items.append(item)
+        _pool_shown[kind] = n + 1
+        _restack = True
+    _pool_used[kind] = n + 1
+    _frame.append(item)
+    return item
+
+def _next_frame():
+    global _stack, _frame, _restack
+    if _frame:
+        _stack, _frame = _frame, []
+    _pool_used.clear()
+    _restack = False
+
+def _hide_unused():
+    for kind, items in _pool.items():
+        used = _pool_used.get(kind, 0)
+        for item in items[used:_pool_shown.get(kind, 0)]:
+            _canvas.itemconfigure(item, state="hidden")
+        _pool_shown[kind] = min(used, _pool_shown.get(kind, 0))
+
+def setLongSession(flag=True, max_images=16):
+    """
+    Uzun oturum kipi: öğe havuzu açılır ve resim önbelleği max_images ile
+    sınırlanır. Kapatılınca havuzdaki öğeler silinir.
+    """
+    global _pooling, _image_cache_max
+    _init()
+    if _pooling and not flag:
+        _canvas.delete(*[i for items in _pool.values() for i in items])
+        _pool.clear()
+        _pool_shown.clear()
+        _frame.clear()
+        _stack.clear()
+        _next_frame()
+    _pooling = flag
+    _image_cache_max = max_images if flag else 64
+
+def resourceCounts():
+    """Takip edilen kaynakların anlık sayıları (sızıntı izlemek için)."""
+    counts = {"images":          len(_image_cache),
+              "temp_files":      _temp_files,
+              "pool":            sum(map(len, _pool.values())),
+              "pool_visible":    sum(_pool_shown.values()),
+              "key_queue":       len(_key_queue),
+              "held_keys":       len(_held)}
+    if _root is not None:
+        counts["canvas_items"] = len(_canvas.find_all())
+        counts["tk_images"]    = len(_root.image_names())
+    return counts
+
 # ─── Çizim Primitifleri ─────────────────────────────────────────────────
 def line(x1, y1, x2, y2):
     _init()
     s1, s2 = _to_screen(x1, y1), _to_screen(x2, y2)
-    _canvas.create_line(*s1, *s2,
-                        fill  = _hex(_pen_color),
-                        width = _pen_radius)
+    _create("line", (*s1, *s2),
+            fill  = _hex(_pen_color),
+            width = _pen_radius*_px)
 
 def circle(x, y, r):
     _init()
     sx, sy = _to_screen(x, y)
-    sr = r*_width/(_xmax - _xmin)
-    _canvas.create_oval(sx-sr, sy-sr, sx+sr, sy+sr,
-                        outline = _hex(_pen_color),
-                        width   = _pen_radius)
+    sr = r*_ax
+    _create("oval", (sx-sr, sy-sr, sx+sr, sy+sr),
+            outline = _hex(_pen_color),
+            width   = _pen_radius*_px)
 
 def filledCircle(x, y, r):
     _init()
     sx, sy = _to_screen(x, y)
-    sr = r*_width/(_xmax - _xmin)
-    _canvas.create_oval(sx-sr, sy-sr, sx+sr, sy+sr,
-                        outline = _hex(_pen_color),
-                        width   = _pen_radius,
-                        fill    = _hex(_pen_color))
+    sr = r*_ax
+    _create("oval", (sx-sr, sy-sr, sx+sr, sy+sr),
+            outline = _hex(_pen_color),
+            width   = _pen_radius*_px,
+            fill    = _hex(_pen_color))
 
 def rectangle(x, y, hw, hh):
     _init()
     sx, sy = _to_screen(x, y)
-    w = hw*_width/(_xmax - _xmin)
-    h = hh*_height/(_ymax - _ymin)
-    _canvas.create_rectangle(sx-w, sy-h, sx+w, sy+h,
-                             outline = _hex(_pen_color),
-                             width   = _pen_radius)
+    w, h = hw*_ax, -hh*_ay
+    _create("rectangle", (sx-w, sy-h, sx+w, sy+h),
+            outline = _hex(_pen_color),
+            width   = _pen_radius*_px)
 
 def filledRectangle(x, y, hw, hh):
     _init()
     sx, sy = _to_screen(x, y)
-    w = hw*_width/(_xmax - _xmin)
-    h = hh*_height/(_ymax - _ymin)
-    _canvas.create_rectangle(sx-w, sy-h, sx+w, sy+h,
-                             outline = _hex(_pen_color),
-                             width   = _pen_radius,
-                             fill    = _hex(_pen_color))
+    w, h = hw*_ax, -hh*_ay
+    _create("rectangle", (sx-w, sy-h, sx+w, sy+h),
+            outline = _hex(_pen_color),
+            width   = _pen_radius*_px,
+            fill    = _hex(_pen_color))
 
 # Kareler
 def square(x, y, half):
@@ -183,65 +393,189 @@ def polygon(*coords):
     pts = []
     for i in range(0, len(coords), 2):
         pts.extend(_to_screen(coords[i], coords[i+1]))
-    _canvas.create_polygon(*pts,
-                           outline = _hex(_pen_color),
-                           fill    = "")
+    _create("polygon", pts,
+            outline = _hex(_pen_color),
+            fill    = "")
 
 def filledPolygon(*coords):
     _init()
     pts = []
     for i in range(0, len(coords), 2):
         pts.extend(_to_screen(coords[i], coords[i+1]))
-    _canvas.create_polygon(*pts,
-                           outline = _hex(_pen_color),
-                           fill    = _hex(_pen_color))
+    _create("polygon", pts,
+            outline = _hex(_pen_color),
+            fill    = _hex(_pen_color))
 
 # Metin
 def text(x, y, s):
     _init()
     sx, sy = _to_screen(x, y)
-    _canvas.create_text(sx, sy,
-                        text = s,
-                        fill = _hex(_pen_color),
-                        font = (_font_family, _font_size))
+    _create("text", (sx, sy),
+            text = s,
+            fill = _hex(_pen_color),
+            font = _font())
 
 # Kalın Metin
 def boldText(x, y, s):
     _init()
     sx, sy = _to_screen(x, y)
-    _canvas.create_text(sx, sy,
-                        text = s,
-                        fill = _hex(_pen_color),
-                        font = (_font_family, _font_size, "bold"))
+    _create("text", (sx, sy),
+            text = s,
+            fill = _hex(_pen_color),
+            font = _font(bold=True))
+
+# ─── Toplu Primitifler ──────────────────────────────────────────────────
+# Koordinatlar diziler halinde alınır ve tek geçişte dönüştürülür;
+# renk dizgeleri her öğe için değil, her farklı renk için bir kez üretilir.
+def lines(x1s, y1s, x2s, y2s):
+    _init()
+    sx1, sy1 = _to_screen_array(x1s, y1s)
+    sx2, sy2 = _to_screen_array(x2s, y2s)
+    fill = _hex(_pen_color)
+    for pts in np.column_stack((sx1, sy1, sx2, sy2)).tolist():
+        _create("line", pts, fill=fill, width=_pen_radius*_px)
+
+def filledSquares(xs, ys, half, colors=None):
+    """colors verilirse her kare kendi rengiyle, yoksa kalem rengiyle."""
+    _init()
+    sx, sy = _to_screen_array(xs, ys)
+    w, h = half*_ax, -half*_ay
+    boxes = np.column_stack((sx - w, sy - h, sx + w, sy + h)).tolist()
+    if colors is None:
+        fills = [_hex(_pen_color)] * len(boxes)
+    else:
+        fills = [_hex(c) for c in colors]
+    for box, fill in zip(boxes, fills):
+        _create("rectangle", box,
+                outline = fill,
+                width   = _pen_radius*_px,
+                fill    = fill)
+
+def texts(xs, ys, strings, colors=None, bold=False):
+    _init()
+    sx, sy = _to_screen_array(xs, ys)
+    font = _font(bold)
+    if colors is None:
+        fills = [_hex(_pen_color)] * len(strings)
+    else:
+        fills = [_hex(c) for c in colors]
+    for x, y, s, fill in zip(sx.tolist(), sy.tolist(), strings, fills):
+        _create("text", (x, y), text=s, fill=fill, font=font)
 
 # ─── Resim Gösterme ──────────────────────────────────────────────────────
 def picture(pic, x, y):
     _init()
-    # Picture.save() veya doğrudan dosya adı
-    if hasattr(pic, "save"):
-        tf = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
-        tf.close()
-        pic.save(tf.name)
-        path = tf.name
+    # Dosya yolu olan resimler kaynak yoluna göre, yolu olmayan Picture'lar
+    # nesnenin kendisine göre sınırlı bir LRU önbellekte tutulur.
+    path = pic.path() if hasattr(pic, "path") else pic
+    key = pic if path is None else path
+    img = _image_cache.get(key)
+    if img is not None:
+        _image_cache.move_to_end(key)
     else:
-        path = pic
-    img = tk.PhotoImage(file=path)
-    _photo_images.append(img)
+        img = tk.PhotoImage(file=path) if path is not None else _load_copy(pic)
+        _image_cache[key] = img
+        while len(_image_cache) > _image_cache_max:
+            _image_cache.popitem(last=False)
     sx, sy = _to_screen(x, y)
-    _canvas.create_image(sx, sy, image=img)
+    _create("image", (sx, sy), image=img)
+
+def _load_copy(pic):
+    """Yolu olmayan Picture'ı geçici dosya üzerinden yükler; dosya hemen silinir."""
+    global _temp_files
+    tf = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
+    tf.close()
+    _temp_files += 1
+    try:
+        pic.save(tf.name)
+        return tk.PhotoImage(file=tf.name)   # veri burada belleğe okunur
+    finally:
+        os.unlink(tf.name)
+        _temp_files -= 1
 
 # ─── Etkileşim ──────────────────────────────────────────────────────────
-def hasNextKeyTyped(): return len(_key_queue) > 0
-def nextKeyTyped():    return _key_queue.pop(0) if hasNextKeyTyped() else None
+def setKeyRepeat(das=170, arr=50, keys=("left", "right", "down")):
+    """
+    keys içindeki tuşlar basılı tutulunca das ms sonra her arr ms'de bir
+    tekrar üretilir; diğer tuşlar yalnızca basılı durumları için izlenir
+    (isKeyHeld). das=None ile işletim sisteminin tekrarına dönülür.
+    """
+    global _das, _arr, _repeat_keys
+    _held.clear()
+    _released.clear()
+    if das is None:
+        _das, _arr, _repeat_keys = None, None, frozenset()
+    else:
+        _das, _arr = das/1000.0, max(arr, 1)/1000.0
+        _repeat_keys = frozenset(keys)
+
+def _take():
+    key, t = _key_queue.popleft()
+    _unrendered.append(t)
+    return key, t
+
+def hasNextKeyTyped():
+    _poll_repeats()
+    return len(_key_queue) > 0
+def nextKeyTyped():    return _take()[0] if hasNextKeyTyped() else None
+def nextKeyEvent():    return _take() if hasNextKeyTyped() else None
+def drainKeys():
+    """Bekleyen tüm tuş olaylarını (tuş, zaman) listesi olarak döndürür."""
+    _poll_repeats()
+    return [_take() for _ in range(len(_key_queue))]
+def isKeyHeld(key):    return key in _held
 def clearKeysTyped():  _key_queue.clear()
+def inputLatencies():
+    """Son olayların girişten ekrana gecikmeleri (saniye)."""
+    return list(_input_latency)
 def mousePressed():    return _mouse_pressed
 def mouseX():          return _to_world(_mouse_x, _mouse_y)[0]
 def mouseY():          return _to_world(_mouse_x, _mouse_y)[1]
 
+# ─── Kalıcı Öğeler ──────────────────────────────────────────────────────
+# Kalıcı öğeler clear() ile silinmez ve her show() öncesi en üste alınır;
+# her karede yeniden oluşturulmak yerine yalnızca içerikleri güncellenir.
+def retainedText(x, y, s="", anchor="nw", c=None, family=None, size=None):
+    """
+    Kalıcı metin öğesi oluşturur ve kimliğini döndürür. Renk ve yazı tipi
+    verilirse kalem/yazı ayarları değiştirilmeden kullanılır.
+    """
+    _init()
+    sx, sy = _to_screen(x, y)
+    font = (family or _font_family,
+            max(1, round((size or _font_size)*_px)))
+    return _canvas.create_text(sx, sy,
+                               text   = s,
+                               anchor = anchor,
+                               fill   = _hex(c or _pen_color),
+                               font   = font,
+                               tags   = (_RETAINED,))
+
+def setRetainedText(item, s):
+    _canvas.itemconfigure(item, text=s)
+
+def setRetainedVisible(item, flag=True):
+    _canvas.itemconfigure(item, state="normal" if flag else "hidden")
+
+def deleteRetained(item):
+    _canvas.delete(item)
+
+def itemCount():
+    """Tuvaldeki toplam öğe sayısı (kalıcılar dahil)."""
+    _init()
+    return len(_canvas.find_all())
+
 # ─── Animasyon ve Mainloop ─────────────────────────────────────────────
 def show(t=None):
     _init()
+    if _pooling:
+        _hide_unused()
+    _canvas.tag_raise(_RETAINED)
     _root.update()
+    if _unrendered:
+        now = time.monotonic()
+        _input_latency.extend(now - t0 for t0 in _unrendered)
+        _unrendered.clear()
     if t is not None:
         time.sleep(t/1000.0)    # gerçek bekleme
 
@@ -0,0 +1,103 @@
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from frame_capture import FrameRecorder, Rasterizer, encode_png
+
+SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def _chunks(data):
+    """(tag, body) of every chunk after checking the signature and CRCs."""
+    assert data[:8] == SIGNATURE
+    chunks, pos = [], 8
+    while pos < len(data):
+        length, = struct.unpack('>I', data[pos:pos + 4])
+        tag, body = data[pos + 4:pos + 8], data[pos + 8:pos + 8 + length]
+        crc, = struct.unpack('>I', data[pos + 8 + length:pos + 12 + length])
+        assert crc == zlib.crc32(tag + body), tag
+        chunks.append((tag, body))
+        pos += 12 + length
+    assert pos == len(data)
+    assert chunks[0][0] == b'IHDR' and chunks[-1] == (b'IEND', b'')
+    return chunks
+
+
+def _pixels(body, w, h):
+    raw = np.frombuffer(zlib.decompress(body), dtype=np.uint8)
+    rows = raw.reshape(h, 1 + 3*w)
+    assert not rows[:, 0].any()          # filter type 0 on every row
+    return rows[:, 1:].reshape(h, w, 3)
+
+
+def _boards():
+    # four distinct 4x4 boards, the second one captured twice
+    boards = []
+    for i in range(4):
+        values = np.zeros((4, 4), dtype=np.uint8)
+        values[0, :i + 1] = i + 1
+        boards.append(values)
+    return [boards[0], boards[1], boards[1], boards[2], boards[3]]
+
+
+def test_apng_chunks_frame_count_and_sequence(tmp_path):
+    path = str(tmp_path / 'clip.png')
+    times = [0.0, 0.25, 0.5, 1.0, 1.5]
+    with FrameRecorder(path, 4, 4, cell=8) as rec:
+        for values, t in zip(_boards(), times):
+            assert rec.capture(values, score=10, t=t, block=True)
+    # the repeated board only stretches the previous frame
+    assert (rec.captured, rec.written, rec.dropped) == (5, 4, 0)
+
+    with open(path, 'rb') as f:
+        chunks = _chunks(f.read())
+    tags = [tag for tag, _ in chunks]
+    assert tags[:4] == [b'IHDR', b'acTL', b'fcTL', b'IDAT']
+    w, h = struct.unpack('>II', chunks[0][1][:8])
+    assert (h, w, 3) == rec.raster.shape
+
+    frames, plays = struct.unpack('>II', chunks[1][1])
+    assert (frames, plays) == (4, 0)
+    fctl = [struct.unpack('>IIIIIHHBB', body)
+            for tag, body in chunks if tag == b'fcTL']
+    assert len(fctl) == frames
+    # fcTL and fdAT share one sequence, with no gaps and no repeats
+    seq = [struct.unpack('>I', body[:4])[0]
+           for tag, body in chunks if tag in (b'fcTL', b'fdAT')]
+    assert seq == list(range(len(seq)))
+    assert tags.count(b'fdAT') == frames - 1
+    # delays in ms: 0.5 s for the doubled frame, LAST_FRAME_HOLD at the end
+    assert [c[5] for c in fctl] == [250, 750, 500, 2000]
+    assert all(c[6] == 1000 for c in fctl)
+
+    # the first frame is the whole rendered board
+    first = Rasterizer(4, 4, 8).render(_boards()[0], (), 10)
+    assert np.array_equal(_pixels(chunks[3][1], w, h), first)
+    # later frames are sub-rectangles inside the canvas
+    for _, fw, fh, x0, y0, *_ in fctl[1:]:
+        assert 0 < fw and x0 + fw <= w and 0 < fh and y0 + fh <= h
+
+
+def test_png_sequence_frames_are_valid_pngs(tmp_path):
+    path = str(tmp_path / 'frames')
+    with FrameRecorder(path, 4, 4, cell=8) as rec:
+        for i, values in enumerate(_boards()):
+            rec.capture(values, t=i, block=True)
+    names = sorted(os.listdir(path))
+    assert names == [f'frame_{i:06d}.png' for i in range(5)]
+    for name, values in zip(names, _boards()):
+        with open(os.path.join(path, name), 'rb') as f:
+            chunks = _chunks(f.read())
+        assert [tag for tag, _ in chunks] == [b'IHDR', b'IDAT', b'IEND']
+        w, h = struct.unpack('>II', chunks[0][1][:8])
+        img = Rasterizer(4, 4, 8).render(values)
+        assert np.array_equal(_pixels(chunks[1][1], w, h), img)
+
+
+def test_encode_png_round_trip():
+    img = np.arange(5 * 7 * 3, dtype=np.uint8).reshape(5, 7, 3)
+    chunks = _chunks(encode_png(img, level=1))
+    assert struct.unpack('>IIBBBBB', chunks[0][1]) == (7, 5, 8, 2, 0, 0, 0)
+    assert np.array_equal(_pixels(chunks[1][1], 7, 5), img)
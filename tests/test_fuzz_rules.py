@@ -0,0 +1,91 @@
+import random
+
+import pytest
+
+from fuzz_rules import (ENGINES, MODES, GameGridEngine, random_case,
+                        run_case, shrink, _play)
+
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+@pytest.mark.parametrize('mode', MODES)
+def test_engine_matches_reference(mode, engine):
+    for seed in range(150):
+        case = dict(random_case(random.Random(seed)), mode=mode)
+        assert run_case(case, engine) is None, (seed, case)
+
+
+def test_cases_move_and_rotate_pieces_before_locking():
+    locks = rotations = 0
+    for seed in range(20):
+        case = random_case(random.Random(seed))
+        assert 'board' not in case
+        rotations += case['actions'].count('rotate')
+        failure, engine = _play(case)
+        assert failure is None
+        locks += engine.board() != [[0] * case['w']] * case['h']
+    assert rotations and locks
+
+
+@pytest.mark.parametrize('mode', MODES)
+def test_column_merges_cascade_as_in_sumcheck(mode):
+    # a vertical I lands on 2,2,4 with a 4 at its bottom: sumCheck merges
+    # the lowest pair first and restarts, 2,2,4,4 -> 4,4,4 -> 8,4, in
+    # every mode (pairwise rounds would give 4,8); column 2 stays empty,
+    # so no horizontal pair forms
+    board = [[0] * 4 for _ in range(8)]
+    board[0][3], board[1][3], board[2][3] = 2, 2, 4
+    # the I numbers its tiles top first
+    case = {'h': 8, 'w': 4, 'mode': mode, 'board': board,
+            'pieces': [['I', 0, [256, 128, 64, 4]]],
+            'actions': ['right'] * 3 + ['drop']}
+    failure, engine = _play(case)
+    assert failure is None
+    assert [row[3] for row in engine.board()] == [8, 4, 64, 128, 256, 0, 0, 0]
+    assert engine.score() == 4 + 8
+    assert engine.problems() == []
+
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+def test_rows_left_full_by_a_clear_are_cleared(engine):
+    # the I completes rows 0 and 1; clearing row 0 drops [64,16,2,4] into
+    # row 0, which rowCheck's walk (now at row 1) would leave full
+    board = [[0] * 4 for _ in range(8)]
+    board[0] = [0, 2, 4, 8]
+    board[1] = [0, 16, 2, 4]
+    case = {'h': 8, 'w': 4, 'mode': 'full', 'board': board,
+            'pieces': [['I', 0, [256, 128, 64, 32]]], 'actions': ['drop']}
+    failure, eng = _play(case, engine)
+    assert failure is None
+    assert eng.board()[0] == [128, 0, 0, 0]
+    assert eng.board()[1] == [256, 0, 0, 0]
+    assert eng.grid.row_counts[:2] == [1, 1]
+    assert eng.score() == (32 + 2 + 4 + 8) + (64 + 16 + 2 + 4)
+
+
+class _NoScoreOnMerge(GameGridEngine):
+    """A planted bug: a lock whose merges reach 8 or more scores nothing."""
+    def lock(self, tiles):
+        before = self.grid.score
+        over = super().lock(tiles)
+        if any(v >= 8 for v in self.grid.merged_values):
+            self.grid.score = before
+        return over
+
+
+def test_shrink_reduces_the_action_sequence(monkeypatch):
+    monkeypatch.setitem(ENGINES, 'planted', _NoScoreOnMerge)
+    for seed in range(200):
+        case = random_case(random.Random(seed))
+        if run_case(case, 'planted') is not None:
+            break
+    else:
+        pytest.fail("the planted bug was never hit")
+    small, failure = shrink(case, 'planted')
+    assert run_case(small, 'planted') == failure
+    assert len(small['actions']) < len(case['actions'])
+    assert len(small['pieces']) <= failure[0] + 1
+    # no single action can be removed any more
+    for i in range(len(small['actions'])):
+        fewer = dict(small, actions=small['actions'][:i] +
+                     small['actions'][i+1:])
+        assert run_case(fewer, 'planted') is None
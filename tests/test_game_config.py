@@ -0,0 +1,41 @@
+import argparse
+import json
+
+import pytest
+
+import game_config
+from game_config import GameConfig, PRESETS
+
+
+def _write(tmp_path, d):
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps(d), encoding='utf-8')
+    return str(path)
+
+
+def test_load_uses_file_preset(tmp_path):
+    config = GameConfig.load(_write(tmp_path, {'preset': 'full', 'grid_h': 16}))
+    assert config.pieces == tuple(PRESETS['full']['pieces'])
+    assert config.grid_h == 16
+
+
+def test_load_with_explicit_preset_ignores_file_preset(tmp_path):
+    path = _write(tmp_path, {'preset': 'full', 'grid_w': 8})
+    config = GameConfig.load(path, 'stress')
+    assert config.gravity_curve == tuple(PRESETS['stress']['gravity_curve'])
+    assert config.grid_w == 8
+
+
+def test_config_file_plus_preset_on_command_line(tmp_path):
+    parser = argparse.ArgumentParser()
+    game_config.add_arguments(parser)
+    args = parser.parse_args(['--config', _write(tmp_path, {'preset': 'full'}),
+                              '--preset', 'stress', '--rows', '30'])
+    config = game_config.from_args(args)
+    assert config.grid_h == 30
+    assert config.grid_w == PRESETS['stress']['grid_w']
+
+
+def test_unknown_preset(tmp_path):
+    with pytest.raises(ValueError):
+        GameConfig.load(_write(tmp_path, {'preset': 'nope'}))
@@ -0,0 +1,85 @@
+import random
+
+import numpy as np
+
+from game_grid import GameGrid
+from tetromino import Tetromino
+
+
+def _grid(seed=0, h=10, w=6):
+    # a half-filled board with its last column empty and a full row 0
+    # but for that column
+    rng = random.Random(seed)
+    grid = GameGrid(h, w)
+    for y in range(4):
+        for x in range(w):
+            if x == w - 1:
+                continue
+            if rng.random() < 0.7 or y == 0:
+                grid._set(y, x, GameGrid._make_tile(y, x, rng.randint(1, 3)))
+    grid.score = 40
+    return grid
+
+
+def _piece(grid, type='I', seed=0):
+    piece = Tetromino(type, grid.grid_height, grid.grid_width,
+                      random.Random(seed), values={2: 1, 4: 1})
+    while piece.move('right', grid):
+        pass
+    return piece
+
+
+def _state(grid):
+    return (grid.values.copy(), grid.score, grid.zobrist,
+            list(grid.row_counts),
+            [[None if t is None else (t.number, t.position.x, t.position.y)
+              for t in row] for row in grid.tile_matrix])
+
+
+def _same(a, b):
+    assert np.array_equal(a[0], b[0])
+    assert a[1:] == b[1:]
+
+
+def test_mutating_a_clone_leaves_the_original_unchanged():
+    grid = _grid()
+    grid.current_tetromino = _piece(grid)
+    before = _state(grid)
+    piece_before = grid.current_tetromino.snapshot()
+
+    clone = grid.clone()
+    piece = clone.current_tetromino
+    while piece.move('down', clone):
+        pass
+    # the I fills the gap in row 0: a clear, then drops and merges
+    game_over, lines, merges = clone.lock_tetromino(piece, merge_mode='full')
+    assert not game_over and lines >= 1
+    assert clone.score != before[1]
+    assert clone.zobrist != before[2]
+
+    _same(_state(grid), before)
+    assert grid.current_tetromino.snapshot() == piece_before
+
+
+def test_restore_round_trip():
+    grid = _grid(1)
+    fresh = _state(grid)
+    state = grid.snapshot()
+    for seed in range(3):
+        piece = _piece(grid, 'O', seed)
+        while piece.move('down', grid):
+            pass
+        grid.lock_tetromino(piece, merge_mode='horizontal')
+    assert grid.zobrist != fresh[2]
+
+    grid.restore(state)
+    restored = _state(grid)
+    # tiles are rebuilt, so compare their numbers and positions only
+    _same(restored, fresh)
+    assert grid.snapshot() == state
+
+    # the incremental hash and counters agree with a grid built from scratch
+    other = GameGrid(grid.grid_height, grid.grid_width)
+    other.restore(state)
+    assert other.zobrist == grid.zobrist
+    assert other.row_counts == grid.row_counts
@@ -0,0 +1,69 @@
+import sqlite3
+
+from game_history import HistoryStore
+
+
+def test_human_and_simulated_durations_are_separate(tmp_path):
+    with HistoryStore(str(tmp_path / 'h.db')) as store:
+        store.record(100, 16, 2, duration_s=12.5, player='human')
+        store.record(200, 32, 3, steps=340, player='random')
+        rows = {r['player']: r for r in store.top()}
+    assert (rows['human']['duration_s'], rows['human']['steps']) == (12.5, None)
+    assert (rows['random']['duration_s'], rows['random']['steps']) == (None, 340)
+
+
+def test_top_per_player_uses_index(tmp_path):
+    with HistoryStore(str(tmp_path / 'h.db')) as store:
+        for i in range(50):
+            store.record(i, 2, 0, steps=i, player=('a', 'b')[i % 2])
+        assert [g['score'] for g in store.top(3, player='b')] == [49, 47, 45]
+        plan = ' '.join(r[-1] for r in store._conn.execute(
+            'EXPLAIN QUERY PLAN SELECT * FROM games WHERE player = ? '
+            'ORDER BY score DESC LIMIT ?', ('b', 3)))
+    assert 'games_player' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_legacy_duration_column_is_migrated(tmp_path):
+    path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE games (id INTEGER PRIMARY KEY, played_at REAL NOT NULL,
+            player TEXT, seed INTEGER, score INTEGER NOT NULL,
+            max_tile INTEGER NOT NULL, lines INTEGER NOT NULL,
+            duration REAL NOT NULL, replay TEXT);
+        CREATE INDEX games_score ON games (score DESC);
+        INSERT INTO games VALUES (1, 0, 'human', 5, 10, 4, 0, 30.5, NULL);
+        INSERT INTO games VALUES (2, 0, 'greedy', 5, 20, 8, 1, 412, NULL);
+    ''')
+    conn.close()
+    with HistoryStore(path) as store:
+        rows = {r['id']: r for r in store.by_seed(5)}
+        store.record(30, 8, 0, duration_s=1.0, player='human')
+        assert store.count() == 3
+    assert 'duration' not in rows[1]
+    assert (rows[1]['duration_s'], rows[1]['steps']) == (30.5, None)
+    assert (rows[2]['duration_s'], rows[2]['steps']) == (None, 412)
+
+
+def test_recorded_game_keeps_its_replay_path(tmp_path):
+    import Tetris_2048
+    from frame_capture import FrameRecorder
+    from game_grid import GameGrid
+
+    # what play_game does with --record: capture frames, then save the game
+    replay = str(tmp_path / 'clip.png')
+    grid = GameGrid(20, 12)
+    grid._set(0, 0, GameGrid._make_tile(0, 0, 5))
+    grid.score = 96
+    with FrameRecorder(replay, 20, 12) as recorder:
+        recorder.capture_grid(grid, block=True)
+    Tetris_2048.save_result(grid, 3, 42.0, 7, replay=replay,
+                            path=str(tmp_path / 'h.db'))
+    with HistoryStore(str(tmp_path / 'h.db')) as store:
+        [row] = store.by_seed(7)
+    assert row['replay'] == replay
+    assert (row['score'], row['max_tile'], row['lines']) == (96, 32, 3)
+    assert (row['duration_s'], row['player']) == (42.0, 'human')
+    with open(row['replay'], 'rb') as f:
+        assert f.read(8) == b'\x89PNG\r\n\x1a\n'
@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+import pytest
+
+import game_server
+from game_config import GameConfig
+from game_server import GameServer, BAD_HELLO, StreamReplayer, watch
+
+
+async def _hello(port, line):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(line)
+    reply = await asyncio.wait_for(reader.readline(), 5)
+    rest = await asyncio.wait_for(reader.read(), 5)
+    writer.close()
+    return json.loads(reply), rest
+
+
+def _run(coro_fn):
+    async def main():
+        server = GameServer(seed=1, port=0)
+        await server.start()
+        try:
+            return await coro_fn(server)
+        finally:
+            await server.stop()
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize('line', [b'{not json\n', b'[]\n', b'1\n', b'"x"\n',
+                                  b'null\n'])
+def test_bad_hello_gets_error_and_close(line):
+    reply, rest = _run(lambda server: _hello(server.port, line))
+    assert reply == BAD_HELLO
+    assert rest == b''
+
+
+def test_server_survives_bad_hello():
+    async def session(server):
+        await _hello(server.port, b'[]\n')
+        return await watch(port=server.port, messages=2)
+    replayer = _run(session)
+    assert replayer.state is not None
+
+
+def test_spectator_reconstructs_fast_gravity(monkeypatch):
+    # 1 ms gravity on a small board: a lock every few ms, a keyframe to
+    # check the reconstruction against every 5 locks and at game over
+    monkeypatch.setattr(game_server, 'KEYFRAME_EVERY', 5)
+    config = GameConfig(grid_h=16, grid_w=4, pieces=('I', 'O'),
+                        gravity_curve=(1,))
+
+    async def main():
+        server = GameServer(config, seed=3, port=0)
+        await server.start()
+        reader, writer = await asyncio.open_connection('127.0.0.1',
+                                                       server.port)
+        writer.write(b'{"role": "spectator"}\n')
+        replayer, deltas = StreamReplayer(), 0
+        try:
+            while not (replayer.state and replayer.state.game_over):
+                msg = json.loads(await asyncio.wait_for(reader.readline(), 5))
+                deltas += msg['type'] == 'delta'
+                replayer.apply(msg)
+        finally:
+            writer.close()
+            await server.stop()
+        return replayer, deltas
+
+    replayer, deltas = asyncio.run(main())
+    assert deltas > 5
+    assert replayer.verified > 0
+    assert replayer.mismatches == 0
+    assert replayer.gaps == 0
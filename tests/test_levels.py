@@ -0,0 +1,125 @@
+import time
+
+import pytest
+
+from game_config import GameConfig
+from levels import LevelProgress, LevelTable, Scheduler
+
+
+class FakeClock:
+    """time.monotonic()/time.sleep() that only move when told to."""
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(time, 'sleep', clock.sleep)
+    return clock
+
+
+def test_gravity_ticks_once_per_interval(clock):
+    gravity = Scheduler(0.25)
+    assert gravity.due() == 0
+    clock.now += 0.125
+    assert gravity.due() == 0
+    clock.now += 0.125
+    assert gravity.due() == 1
+    # a slow frame is caught up in whole ticks without losing the phase
+    clock.now += 0.625
+    assert gravity.due() == 2
+    clock.now += 0.125
+    assert gravity.due() == 1
+    assert gravity.next == pytest.approx(clock.now + 0.25)
+
+
+def test_soft_drop_takes_effect_at_once_and_gravity_resumes(clock):
+    gravity = Scheduler(0.25)
+    clock.now += 0.0625
+    gravity.set_interval(0.03125)
+    assert gravity.next == pytest.approx(clock.now + 0.03125)
+    clock.now += 0.125
+    assert gravity.due() == 4
+    # releasing the key does not push the next drop out by a full interval
+    gravity.set_interval(0.25)
+    clock.now += 0.25
+    assert gravity.due() == 1
+
+
+def test_backlog_beyond_max_catchup_is_dropped(clock):
+    gravity = Scheduler(0.25, max_catchup=4)
+    clock.now += 60
+    assert gravity.due() == 4
+    assert gravity.next == clock.now + 0.25
+    assert gravity.due() == 0
+
+
+def test_sleep_waits_for_the_deadline_and_consumes_it(clock):
+    frames = Scheduler(0.5)
+    start = clock.now
+    for i in range(1, 4):
+        frames.sleep()
+        assert clock.now == start + 0.5 * i
+    assert frames.due() == 0
+
+
+def test_piece_locks_after_the_levels_lock_delay(clock):
+    # the drop loop of play_game: fall one row per gravity tick, then
+    # lock once the piece has rested for lock_delay_ms
+    config = GameConfig(gravity_curve=(250,), lock_delay_curve=(500,))
+    level = LevelProgress(config).timings
+    gravity = Scheduler(level.gravity_ms / 1000)
+    height, landed_at, locked_at = 3, None, None
+    start = clock.now
+    while locked_at is None:
+        clock.now += 0.0625
+        for _ in range(gravity.due()):
+            if height == 0:
+                if landed_at is None:
+                    landed_at = clock.now
+                break
+            height -= 1
+        if landed_at is not None and \
+                clock.now - landed_at >= level.lock_delay_ms / 1000:
+            locked_at = clock.now
+    assert landed_at == start + 4 * 0.25
+    assert locked_at == landed_at + 0.5
+
+
+def test_level_table_extends_short_curves():
+    table = LevelTable(GameConfig(gravity_curve=(300, 200, 100),
+                                  soft_drop_curve=(50, 40),
+                                  lock_delay_curve=(500,)))
+    assert len(table) == 3
+    assert tuple(table[0]) == (300, 50, 500)
+    assert tuple(table[2]) == (100, 40, 500)
+    assert table[99] == table[2]
+
+
+def test_level_rises_every_lines_per_level_and_merges_count_partly():
+    config = GameConfig(gravity_curve=(300, 200, 100, 50, 40, 30),
+                        lines_per_level=4, merges_per_line=3)
+    progress = LevelProgress(config)
+    assert not progress.add(lines=3)
+    assert progress.level == 0
+    assert not progress.add(merges=2)
+    assert progress.add(merges=1)          # 3 merges make the fourth line
+    assert progress.level == 1
+    assert progress.timings.gravity_ms == 200
+    assert progress.add(lines=4)
+    assert progress.level == 2
+    # two level boundaries at once still report a single level up
+    assert progress.add(lines=8)
+    assert progress.level == 4
+    assert progress.add(lines=40)
+    assert not progress.add(lines=40)      # capped at the last level
+    assert progress.level == 5
+    assert progress.timings.gravity_ms == 30
@@ -0,0 +1,50 @@
+import atexit
+import gc
+import sqlite3
+
+import stats_store
+from stats_store import StatsStore
+
+
+def _rows(path):
+    with sqlite3.connect(path) as conn:
+        return sorted(conn.execute('SELECT name, worker, value FROM counters'))
+
+
+def test_restarts_reuse_the_same_rows(tmp_path):
+    path = str(tmp_path / 'stats.db')
+    for _ in range(5):            # one store per "game start"
+        store = StatsStore(path, worker='host')
+        store.add('games')
+        store.close()
+    assert _rows(path) == [('games', 'host', 5)]
+
+
+def test_stores_share_one_exit_hook_and_are_not_kept_alive(tmp_path):
+    path = str(tmp_path / 'stats.db')
+    callbacks = atexit._ncallbacks()
+    stores = [StatsStore(path) for _ in range(10)]
+    assert atexit._ncallbacks() == callbacks
+    stores[0].add('games', 3)
+    stats_store._flush_open_stores()
+    assert StatsStore(path).lifetime()['games'] == 3
+    del stores
+    gc.collect()
+    assert not any(s.path == path for s in stats_store._open_stores)
+
+
+def test_per_process_rows_are_folded_into_their_host(tmp_path):
+    path = str(tmp_path / 'stats.db')
+    store = StatsStore(path)
+    store.lifetime()              # creates the schema
+    store.close()
+    with sqlite3.connect(path) as conn:
+        conn.executemany('INSERT INTO counters VALUES (?, ?, ?)',
+                         [('games', 'box:101', 2), ('games', 'box:102', 3),
+                          ('rows_cleared', 'box:101', 7), ('games', 'box', 1),
+                          ('games', 'other', 4)])
+    store = StatsStore(path, worker='box')
+    assert store.lifetime()['games'] == 10
+    store.close()
+    assert _rows(path) == [('games', 'box', 6), ('games', 'other', 4),
+                           ('rows_cleared', 'box', 7)]
@@ -0,0 +1,73 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import stddraw
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(time, 'monotonic', c)
+    stddraw.setKeyRepeat(170, 50, ('left', 'right'))
+    stddraw.clearKeysTyped()
+    yield c
+    stddraw.setKeyRepeat(None)
+    stddraw.clearKeysTyped()
+
+
+def _press(key, t=0):
+    stddraw._on_key(SimpleNamespace(keysym=key, time=t))
+
+
+def _release(key, t=0):
+    stddraw._on_key_release(SimpleNamespace(keysym=key, time=t))
+
+
+def _keys():
+    return [k for k, _ in stddraw.drainKeys()]
+
+
+def test_das_then_arr(clock):
+    _press('left')
+    assert _keys() == ['left']
+    clock.now += 0.169
+    assert _keys() == []
+    clock.now += 0.001
+    assert _keys() == ['left']
+    clock.now += 0.05
+    assert _keys() == ['left']
+    _release('left', 1)
+    clock.now += 1.0
+    assert _keys() == []
+
+
+def test_stall_yields_one_repeat_and_rebases(clock):
+    _press('right')
+    _keys()
+    clock.now += 2.0               # a long frame stall while held
+    assert _keys() == ['right']
+    assert _keys() == []           # no burst of the missed repeats
+    clock.now += 0.049
+    assert _keys() == []
+    clock.now += 0.001
+    assert _keys() == ['right']
+
+
+def test_focus_out_releases_held_keys(clock):
+    _press('left')
+    _press('down')
+    _keys()
+    stddraw._on_focus_out(SimpleNamespace())
+    assert not stddraw.isKeyHeld('left') and not stddraw.isKeyHeld('down')
+    clock.now += 5.0
+    assert _keys() == []
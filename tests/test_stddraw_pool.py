@@ -0,0 +1,101 @@
+import itertools
+
+import pytest
+
+import stddraw
+
+
+class Canvas:
+    """The tkinter.Canvas calls the item pool makes, with a stacking list."""
+    def __init__(self):
+        self.items, self.stack, self.created = {}, [], 0
+        self.ids = itertools.count(1)
+
+    def _create(self, kind, *coords, **opts):
+        item = next(self.ids)
+        self.items[item] = dict(opts, kind=kind, coords=coords)
+        self.stack.append(item)
+        self.created += 1
+        return item
+
+    def __getattr__(self, name):
+        if name.startswith('create_'):
+            return lambda *c, **o: self._create(name[7:], *c, **o)
+        raise AttributeError(name)
+
+    def coords(self, item, *coords):
+        self.items[item]['coords'] = coords
+
+    def itemconfigure(self, item, **opts):
+        self.items[item].update(opts)
+
+    def config(self, **opts):
+        pass
+
+    def delete(self, *tags):
+        for item in tags:
+            del self.items[item]
+            self.stack.remove(item)
+
+    def tag_raise(self, tag):
+        raised = [i for i in self.stack if i == tag
+                  or tag in self.items[i].get('tags', ())]
+        self.stack = [i for i in self.stack if i not in raised] + raised
+
+    def find_all(self):
+        return tuple(self.stack)
+
+    def visible(self):
+        return [(self.items[i]['kind'], self.items[i]['coords'])
+                for i in self.stack
+                if self.items[i].get('state') != 'hidden']
+
+
+@pytest.fixture
+def canvas(monkeypatch):
+    canvas = Canvas()
+    root = type('Root', (), {'update': lambda self: None,
+                             'image_names': lambda self: ()})()
+    monkeypatch.setattr(stddraw, '_canvas', canvas)
+    monkeypatch.setattr(stddraw, '_root', root)
+    stddraw.setLongSession(True)
+    yield canvas
+    stddraw.setLongSession(False)
+
+
+def _frame(kinds):
+    stddraw.clear()
+    for x, kind in enumerate(kinds):
+        if kind == 'square':
+            stddraw.filledSquare(x, 0, 0.5)
+        elif kind == 'text':
+            stddraw.text(x, 0, 'a')
+        else:
+            stddraw.line(x, 0, x, 1)
+    stddraw.show()
+
+
+def test_kinds_reordered_between_frames_reuse_their_items(canvas):
+    _frame(['square', 'text', 'line', 'square', 'text'])
+    assert canvas.created == 5
+    # a changed kind order used to recreate everything after the change
+    frame = ['text', 'square', 'square', 'line', 'text']
+    _frame(frame)
+    assert canvas.created == 5
+    # the visible items follow the draw order, bottom to top
+    assert [kind for kind, _ in canvas.visible()] == \
+        ['text', 'rectangle', 'rectangle', 'line', 'text']
+    assert [c[0] for _, c in canvas.visible()] == \
+        sorted(c[0] for _, c in canvas.visible())
+
+
+def test_unused_items_are_hidden_then_shown_again(canvas):
+    _frame(['square'] * 3 + ['text'])
+    _frame(['square'])
+    assert len(canvas.visible()) == 1
+    assert stddraw.resourceCounts()['pool'] == 4
+    assert stddraw.resourceCounts()['pool_visible'] == 1
+    _frame(['text', 'square', 'square'])
+    assert canvas.created == 4
+    assert [kind for kind, _ in canvas.visible()] == \
+        ['text', 'rectangle', 'rectangle']
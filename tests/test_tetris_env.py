@@ -0,0 +1,86 @@
+import random
+
+import numpy as np
+import pytest
+
+from game_config import GameConfig
+from tetris_env import (HARD_DROP, N_ACTIONS, NOOP, TetrisEnv,
+                        VectorTetrisEnv, observation_shape)
+
+# a small board so that games end (and auto-reset) within a few hundred steps
+CONFIG = GameConfig(grid_h=8, grid_w=6, pieces=('I', 'O', 'Z', 'T'))
+
+
+def _actions(steps, n=None, seed=0):
+    rng = random.Random(seed)
+    if n is None:
+        return [rng.randrange(N_ACTIONS) for _ in range(steps)]
+    return [[rng.randrange(N_ACTIONS) for _ in range(n)]
+            for _ in range(steps)]
+
+
+def _play(seed, actions):
+    env = TetrisEnv(CONFIG)
+    obs, info = env.reset(seed)
+    trace = [(obs.copy(), info)]
+    for action in actions:
+        obs, reward, done, info = env.step(action)
+        trace.append((obs.copy(), reward, done, info))
+        if done:
+            break
+    return trace
+
+
+def _same(a, b):
+    assert len(a) == len(b)
+    for x, y in zip(a, b):
+        assert np.array_equal(x[0], y[0])
+        assert x[1:] == y[1:]
+
+
+def test_reset_and_step_are_deterministic_under_a_seed():
+    actions = _actions(400)
+    first = _play(7, actions)
+    _same(first, _play(7, actions))
+    assert first[0][0].shape == observation_shape(CONFIG)
+    other = _play(8, actions)
+    assert any(not np.array_equal(x[0], y[0]) for x, y in zip(first, other))
+
+
+def test_reset_restarts_the_same_game():
+    env = TetrisEnv(CONFIG)
+    obs, info = env.reset(3)
+    start = obs.copy(), info
+    while not env.step(HARD_DROP)[2]:
+        pass
+    with pytest.raises(RuntimeError):
+        env.step(NOOP)
+    obs, info = env.reset(3)
+    assert np.array_equal(obs, start[0]) and info == start[1]
+
+
+def _run_vector(workers, seeds, actions):
+    with VectorTetrisEnv(len(seeds), CONFIG, workers=workers) as venv:
+        obs, infos = venv.reset(seeds)
+        trace = [(obs.copy(), infos)]
+        for step in actions:
+            obs, rewards, dones, infos = venv.step(step)
+            trace.append((obs.copy(), rewards.tolist(), dones.tolist(),
+                          infos))
+    return trace
+
+
+def test_vector_env_with_workers_matches_single_process():
+    seeds = [11, 12, 13, 14, 15]
+    actions = _actions(300, n=len(seeds), seed=1)
+    local = _run_vector(0, seeds, actions)
+    # some game must finish so that the auto-reset path is compared too
+    assert any('final_score' in info for step in local[1:] for info in step[3])
+    _same(local, _run_vector(2, seeds, actions))
+
+    # and each env follows the same game as a lone TetrisEnv (up to the
+    # step that ends it, whose observation is already the next game's)
+    for i, seed in enumerate(seeds):
+        alone = _play(seed, [step[i] for step in actions])
+        for (obs, *_), (vobs, *_) in zip(alone[:-1], local):
+            assert np.array_equal(obs, vobs[i])
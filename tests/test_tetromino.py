@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+from game_config import ALL_PIECES
+from game_grid import GameGrid
+from tetromino import Tetromino
+
+
+def _piece(type, grid, seed=0):
+    piece = Tetromino(type, grid.grid_height, grid.grid_width,
+                      random.Random(seed), values={2: 1, 4: 1, 8: 1})
+    # bring the whole matrix inside the grid so that every turn fits
+    for _ in range(len(piece.tile_matrix)):
+        piece.move('down', grid)
+    return piece
+
+
+def _layout(piece):
+    return [[None if t is None else (id(t), t.position.x, t.position.y)
+             for t in row] for row in piece.tile_matrix]
+
+
+@pytest.mark.parametrize('type', ALL_PIECES)
+def test_four_turns_return_to_the_original_matrix(type):
+    grid = GameGrid(20, 12)
+    piece = _piece(type, grid)
+    start, cells = _layout(piece), piece.snapshot()[4]
+    for turn in range(1, 5):
+        assert piece.rotateTetromino(grid)
+        assert piece.rotation == turn % 4
+        layout = _layout(piece)
+        if turn < 4:
+            assert layout != start
+        # every tile stays where the matrix says it is
+        n = len(piece.tile_matrix)
+        for row in range(n):
+            for col in range(n):
+                if layout[row][col] is not None:
+                    _, x, y = layout[row][col]
+                    assert x == piece.bottom_left_corner.x + col
+                    assert y == piece.bottom_left_corner.y + (n - 1) - row
+    assert _layout(piece) == start
+    assert piece.snapshot()[4] == cells
+
+
+def test_rotation_is_refused_at_the_wall_and_on_occupied_cells():
+    grid = GameGrid(20, 12)
+    piece = _piece('I', grid)
+    while piece.move('right', grid):
+        pass
+    # the vertical I sits in column 0 of its matrix; a turn needs 3 more
+    before = piece.snapshot()
+    assert not piece.rotateTetromino(grid)
+    assert piece.snapshot() == before
+
+    piece = _piece('T', grid)
+    x, y = piece.bottom_left_corner.x, piece.bottom_left_corner.y
+    # the first turn of a T fills the bottom cell of its right column
+    grid.tile_matrix[y][x + 2] = object()
+    before = piece.snapshot()
+    assert not piece.rotateTetromino(grid)
+    assert piece.snapshot() == before
+
+
+def test_mutating_a_clone_leaves_the_original_unchanged():
+    grid = GameGrid(20, 12)
+    piece = _piece('T', grid)
+    before = piece.snapshot()
+    clone = piece.clone()
+    assert clone.snapshot() == before
+    assert clone.move('left', grid) and clone.move('down', grid)
+    assert clone.rotateTetromino(grid)
+    for tile in clone.tile_matrix[clone.tile_matrix != None]:
+        tile.number *= 2
+    assert piece.snapshot() == before
+    assert piece.rotation == 0
+
+
+def test_restore_round_trip():
+    grid = GameGrid(20, 12)
+    piece = _piece('L', grid, seed=3)
+    before = piece.snapshot()
+    piece.rotateTetromino(grid)
+    piece.move('right', grid)
+    piece.move('down', grid)
+    assert piece.snapshot() != before
+    piece.restore(before)
+    assert piece.snapshot() == before
+    # and the restored piece moves and turns like a fresh one
+    fresh = _piece('L', grid, seed=3)
+    for p in (piece, fresh):
+        p.rotateTetromino(grid)
+        p.move('left', grid)
+    assert piece.snapshot() == fresh.snapshot()
@@ -0,0 +1,52 @@
+import math
+import random
+
+import pytest
+
+import tournament
+from tournament import paired_test, t_pvalue
+
+
+@pytest.mark.parametrize('t, df', [(2.262157, 9), (2.045230, 29),
+                                   (12.706205, 1), (1.959964, 10**7)])
+def test_t_pvalue_matches_tables(t, df):
+    assert t_pvalue(t, df) == pytest.approx(0.05, abs=1e-5)
+
+
+def test_small_samples_are_not_anti_conservative():
+    # the same mean/se ratio is less significant at n = 8 than under the
+    # normal approximation
+    a = [10, 12, 9, 14, 11, 13, 10, 15]
+    b = [9, 10, 9, 11, 10, 10, 9, 12]
+    diff, se, p = paired_test(a, b)
+    assert p > math.erfc(abs(diff / se) / math.sqrt(2))
+
+
+def _fake_play(offsets):
+    """play() stand-in: policy score = seed luck + policy offset + noise."""
+    def play(policy, seed, config=None):
+        luck  = random.Random(seed).gauss(1000, 300)
+        noise = random.Random(f"{policy}:{seed}").gauss(0, 50)
+        score = luck + offsets[policy] + noise
+        return {'seed': seed, 'score': score, 'max_tile': 0, 'steps': 0,
+                'player': policy}
+    return play
+
+
+def test_identical_policies_do_not_resolve(monkeypatch):
+    monkeypatch.setattr(tournament, 'play', _fake_play({'a': 0, 'b': 0}))
+    false_positives = 0
+    for first_seed in range(0, 2000, 100):
+        _, tests, threshold = tournament.tournament(
+            ['a', 'b'], first_seed=first_seed, batch=8, max_games=96,
+            log=lambda msg: None, min_games=8)
+        false_positives += tests[('a', 'b')][2] < threshold
+    assert false_positives == 0
+
+
+def test_no_early_stop_before_min_games(monkeypatch):
+    monkeypatch.setattr(tournament, 'play', _fake_play({'a': 500, 'b': 0}))
+    results, tests, threshold = tournament.tournament(
+        ['a', 'b'], batch=5, max_games=100, log=lambda msg: None)
+    assert len(results['a']) == tournament.MIN_GAMES
+    assert tests[('a', 'b')][2] < threshold
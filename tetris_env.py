@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+tetris_env.py
+
+Gym-style programmatic interface over the game rules for training agents:
+TetrisEnv plays one seeded game without rendering, VectorTetrisEnv steps
+many of them per call, in-process or across worker processes that write
+their observations into shared memory.
+
+Observations are uint8 arrays of shape (2, grid_h, grid_w): channel 0 holds
+log2 of the locked tiles, channel 1 log2 of the active tetromino's tiles
+that are inside the grid (0 = empty). They are views into buffers that are
+reused on every call; copy them if they must outlive the next step.
+"""
+import random
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+from game_grid   import GameGrid
+from tetromino   import Tetromino
+from game_config import GameConfig
+
+# Actions
+NOOP, LEFT, RIGHT, DOWN, HARD_DROP = range(5)
+N_ACTIONS = 5
+_MOVES = {LEFT: 'left', RIGHT: 'right', DOWN: 'down'}
+
+# Spawn values used when the config leaves numbering to the tile,
+# so that a seed fully determines the game
+DEFAULT_SPAWN_VALUES = {2: 1.0, 4: 1.0}
+
+
+def observation_shape(config):
+    return (2, config.grid_h, config.grid_w)
+
+
+class TetrisEnv:
+    """
+    One headless game. Each step applies the action, then one gravity
+    step; a piece that cannot fall (or is hard-dropped) is locked.
+    """
+    def __init__(self, config=None, obs_buffer=None):
+        self.config = config or GameConfig()
+        self.spawn_values = self.config.spawn_values or DEFAULT_SPAWN_VALUES
+        shape = observation_shape(self.config)
+        if obs_buffer is None:
+            obs_buffer = np.zeros(shape, dtype=np.uint8)
+        elif obs_buffer.shape != shape or obs_buffer.dtype != np.uint8:
+            raise ValueError(f"obs_buffer must be uint8 with shape {shape}")
+        self.obs = obs_buffer
+        self.rng = random.Random()
+        self.grid = None
+        self.current = None
+        self.next_piece = None
+        self.done = True
+        self.steps = 0
+        self.locks = 0
+
+    # ─── Gym API ──────────────────────────────────────────────────────────
+    def reset(self, seed=None):
+        """Start a new game; returns (observation, info)."""
+        self.rng.seed(seed)
+        c = self.config
+        self.grid = GameGrid(c.grid_h, c.grid_w)
+        self.current = self._new_piece()
+        self.next_piece = self._new_piece()
+        self.grid.current_tetromino = self.current
+        self.done = False
+        self.steps = 0
+        self.locks = 0
+        return self._observe(), self._info(0, 0)
+
+    def step(self, action):
+        """Returns (observation, reward, done, info)."""
+        return self._advance(action, gravity=True)
+
+    def act(self, action):
+        """Like step() but without the gravity step (for real-time play)."""
+        return self._advance(action, gravity=False)
+
+    # ─── Internals ────────────────────────────────────────────────────────
+    def _advance(self, action, gravity):
+        if self.done:
+            raise RuntimeError("step() called on a finished game; call reset()")
+        score_before = self.grid.score
+        self.steps += 1
+        lines = merges = 0
+        if action == HARD_DROP:
+            while self.current.move('down', self.grid):
+                pass
+            lines, merges = self._lock()
+        else:
+            if action in _MOVES:
+                self.current.move(_MOVES[action], self.grid)
+            elif action != NOOP:
+                raise ValueError(f"Invalid action: {action}")
+            if gravity and not self.current.move('down', self.grid):
+                lines, merges = self._lock()
+        reward = self.grid.score - score_before
+        return self._observe(), reward, self.done, self._info(lines, merges)
+
+    def _new_piece(self):
+        c = self.config
+        return Tetromino(self.rng.choice(c.pieces), c.grid_h, c.grid_w,
+                         rng=self.rng, values=self.spawn_values)
+
+    def _lock(self):
+        game_over, lines, merges = self.grid.lock_tetromino(
+            self.current, self.config.clear_rows, self.config.merge_tiles,
+            self.config.merge_mode)
+        self.done = game_over
+        self.locks += 1
+        if not game_over:
+            self.current, self.next_piece = self.next_piece, self._new_piece()
+            self.grid.current_tetromino = self.current
+        return lines, merges
+
+    def _observe(self):
+        obs = self.obs
+        obs[0] = self.grid.values
+        obs[1].fill(0)
+        if not self.done:
+            h, w = self.config.grid_h, self.config.grid_w
+            pm = self.current.tile_matrix
+            for t in pm[pm != None]:
+                p = t.position
+                if 0 <= p.y < h and 0 <= p.x < w:
+                    obs[1, p.y, p.x] = t.number.bit_length() - 1
+        return obs
+
+    def _info(self, lines, merges):
+        return {'score': self.grid.score, 'lines': lines, 'merges': merges,
+                'next': self.next_piece.type, 'steps': self.steps,
+                'locks': self.locks}
+
+
+# ─── Vectorized environments ──────────────────────────────────────────────
+def _worker(conn, shm_name, shape, lo, hi, config):
+    """Runs envs lo..hi-1 of a VectorTetrisEnv inside a worker process."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        obs = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        sub = _SyncEnvs(config, obs[lo:hi])
+        while True:
+            cmd, arg = conn.recv()
+            if cmd == 'reset':
+                conn.send(sub.reset(arg))
+            elif cmd == 'step':
+                conn.send(sub.step(arg))
+            else:
+                break
+        del obs, sub
+    finally:
+        shm.close()
+        conn.close()
+
+
+class _SyncEnvs:
+    """A group of TetrisEnvs stepped in-process over a shared obs block."""
+    def __init__(self, config, obs):
+        self.envs = [TetrisEnv(config, obs[i]) for i in range(len(obs))]
+        self.rewards = np.zeros(len(obs), dtype=np.int64)
+        self.dones = np.zeros(len(obs), dtype=bool)
+
+    def reset(self, seeds):
+        return [env.reset(seed)[1] for env, seed in zip(self.envs, seeds)]
+
+    def step(self, actions):
+        infos = []
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            _, reward, done, info = env.step(int(action))
+            if done:
+                # auto-reset; the final score stays in info
+                info['final_score'] = info['score']
+                env.reset(env.rng.getrandbits(32))
+            self.rewards[i], self.dones[i] = reward, done
+            infos.append(info)
+        return self.rewards, self.dones, infos
+
+
+class VectorTetrisEnv:
+    """
+    n TetrisEnvs stepped together. With workers=0 they run in this
+    process; otherwise they are split across that many processes that
+    write observations straight into one shared-memory block.
+    Finished games are reset automatically inside step().
+    """
+    def __init__(self, n, config=None, workers=0):
+        self.n = n
+        self.config = config or GameConfig()
+        self.shape = (n,) + observation_shape(self.config)
+        self._procs, self._conns, self._shm = [], [], None
+        if workers <= 0:
+            self.obs = np.zeros(self.shape, dtype=np.uint8)
+            self._local = _SyncEnvs(self.config, self.obs)
+            return
+        self._local = None
+        size = int(np.prod(self.shape))
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.obs = np.ndarray(self.shape, dtype=np.uint8, buffer=self._shm.buf)
+        bounds = np.linspace(0, n, min(workers, n) + 1).astype(int)
+        self._slices = list(zip(bounds[:-1], bounds[1:]))
+        for lo, hi in self._slices:
+            parent, child = mp.Pipe()
+            p = mp.Process(target=_worker, daemon=True,
+                           args=(child, self._shm.name, self.shape,
+                                 lo, hi, self.config))
+            p.start()
+            child.close()
+            self._procs.append(p)
+            self._conns.append(parent)
+        self.rewards = np.zeros(n, dtype=np.int64)
+        self.dones = np.zeros(n, dtype=bool)
+
+    def reset(self, seeds=None):
+        """seeds: one per env (or None); returns (observations, infos)."""
+        if seeds is None:
+            seeds = [None] * self.n
+        if self._local:
+            return self.obs, self._local.reset(seeds)
+        for conn, (lo, hi) in zip(self._conns, self._slices):
+            conn.send(('reset', list(seeds[lo:hi])))
+        infos = []
+        for conn in self._conns:
+            infos.extend(conn.recv())
+        return self.obs, infos
+
+    def step(self, actions):
+        """Returns (observations, rewards, dones, infos)."""
+        if self._local:
+            rewards, dones, infos = self._local.step(actions)
+            return self.obs, rewards, dones, infos
+        actions = np.asarray(actions)
+        for conn, (lo, hi) in zip(self._conns, self._slices):
+            conn.send(('step', actions[lo:hi]))
+        infos = []
+        for conn, (lo, hi) in zip(self._conns, self._slices):
+            rewards, dones, sub_infos = conn.recv()
+            self.rewards[lo:hi], self.dones[lo:hi] = rewards, dones
+            infos.extend(sub_infos)
+        return self.obs, self.rewards, self.dones, infos
+
+    def close(self):
+        for conn in self._conns:
+            try:
+                conn.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for p in self._procs:
+            p.join(timeout=1)
+            if p.is_alive():
+                p.terminate()
+        self._procs, self._conns = [], []
+        if self._shm is not None:
+            self.obs = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
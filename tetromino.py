@@ -3,16 +3,18 @@ from tile import Tile # used for representing each tile on the tetromino
 from point import Point # used for tile positions
 import numpy as np # fundamental Python module for scientific computing
 
-# Class used for representing tetrominoes with 3 out of 7 different types/shapes 
-# as (I, O and Z)
+# Class used for representing tetrominoes with 7 different types/shapes 
+# as (I, O, Z, S, T, L and J)
 class Tetromino:
    # Constructor to create a tetromino with a given type (shape)
-   def __init__(self, type, grid_height, grid_width):
+   # rng: random number generator used for the spawn position and values
+   # values: optional spawn value distribution as {number: weight}
+   def __init__(self, type, grid_height, grid_width, rng=random, values=None):
       # set grid_height and grid_width from input parameters
       self.grid_height = grid_height
       self.grid_width = grid_width
       self.type = type
-      self.rotatedBefore = False
+      self.rotation = 0  # number of clockwise quarter turns (0-3)
       # set the shape of the tetromino based on the given type
       occupied_tiles = []
       if type == 'I':
@@ -36,6 +38,36 @@ class Tetromino:
          occupied_tiles.append((1, 0))
          occupied_tiles.append((1, 1))
          occupied_tiles.append((2, 1))  
+      elif type == 'S':
+         n = 3  # n = number of rows = number of columns in the tile matrix
+         # shape of the tetromino S in its initial orientation
+         occupied_tiles.append((1, 0))
+         occupied_tiles.append((2, 0))
+         occupied_tiles.append((0, 1))
+         occupied_tiles.append((1, 1))
+      elif type == 'T':
+         n = 3  # n = number of rows = number of columns in the tile matrix
+         # shape of the tetromino T in its initial orientation
+         occupied_tiles.append((0, 0))
+         occupied_tiles.append((1, 0))
+         occupied_tiles.append((2, 0))
+         occupied_tiles.append((1, 1))
+      elif type == 'L':
+         n = 3  # n = number of rows = number of columns in the tile matrix
+         # shape of the tetromino L in its initial orientation
+         occupied_tiles.append((0, 0))
+         occupied_tiles.append((0, 1))
+         occupied_tiles.append((0, 2))
+         occupied_tiles.append((1, 2))
+      elif type == 'J':
+         n = 3  # n = number of rows = number of columns in the tile matrix
+         # shape of the tetromino J in its initial orientation
+         occupied_tiles.append((1, 0))
+         occupied_tiles.append((1, 1))
+         occupied_tiles.append((1, 2))
+         occupied_tiles.append((0, 2))
+      else:
+         raise ValueError(f"Unknown tetromino type: {type}")
       # create a matrix of numbered tiles based on the shape of the tetromino
       self.tile_matrix = np.full((n, n), None)
       # initial position of the bottom-left tile in the tile matrix just before 
@@ -44,7 +76,7 @@ class Tetromino:
       # upper side of the game grid
       self.bottom_left_corner.y = grid_height
       # a random horizontal position 
-      self.bottom_left_corner.x = random.randint(0, grid_width - n)
+      self.bottom_left_corner.x = rng.randint(0, grid_width - n)
       # create each tile by computing its position w.r.t. the game grid based on 
       # its bottom_left_corner
       for i in range(len(occupied_tiles)):
@@ -55,7 +87,12 @@ class Tetromino:
          # vertical position of the tile          
          position.y = self.bottom_left_corner.y + (n - 1) - row_index
          # create the tile on the computed position 
-         self.tile_matrix[row_index][col_index] = Tile(position)
+         tile = Tile(position)
+         # draw its number from the configured distribution (if any)
+         if values is not None:
+            tile.number = rng.choices(list(values), list(values.values()))[0]
+            tile.background_color = tile.color_generator()
+         self.tile_matrix[row_index][col_index] = tile
       
    # Method for drawing the tetromino on the game grid
    def draw(self):
@@ -70,6 +107,55 @@ class Tetromino:
                if position.y < self.grid_height:
                   self.tile_matrix[row][col].draw() 
 
+   # Method for taking a compact snapshot of the tetromino: its type, rotation
+   # (quarter turns), bottom left corner and (row, col, x, y, number) of each tile
+   def snapshot(self):
+      cells = []
+      n = len(self.tile_matrix)  # n = number of rows = number of columns
+      for row in range(n):
+         for col in range(n):
+            tile = self.tile_matrix[row][col]
+            if tile is not None:
+               cells.append((row, col, tile.position.x, tile.position.y,
+                             tile.number))
+      return (self.type, self.rotation, self.bottom_left_corner.x,
+              self.bottom_left_corner.y, tuple(cells))
+
+   # Method for returning the tetromino to a snapshot taken by itself (or by
+   # a tetromino of the same type); the existing tile objects are reused
+   def restore(self, snapshot):
+      type, rotation, corner_x, corner_y, cells = snapshot
+      if type != self.type:
+         raise ValueError("Snapshot is of a different tetromino type")
+      tiles = [t for t in self.tile_matrix.flat if t is not None]
+      self.tile_matrix.fill(None)
+      for tile, (row, col, x, y, number) in zip(tiles, cells):
+         tile.position.x, tile.position.y = x, y
+         if tile.number != number:
+            tile.number = number
+            tile.background_color = tile.color_generator()
+         self.tile_matrix[row][col] = tile
+      self.rotation = rotation
+      self.bottom_left_corner = Point(corner_x, corner_y)
+
+   # Method for creating an independent copy of the tetromino; each tile is
+   # rebuilt from its attributes (type.__new__ and a dict copy) rather than
+   # going through copy.copy, and the matrix is copied in one go
+   def clone(self):
+      clone = Tetromino.__new__(Tetromino)
+      clone.__dict__.update(self.__dict__)
+      clone.tile_matrix = self.tile_matrix.copy()
+      flat = clone.tile_matrix.ravel()  # a view: writes go into the copy
+      for i, tile in enumerate(self.tile_matrix.flat):
+         if tile is not None:
+            copied = type(tile).__new__(type(tile))
+            copied.__dict__.update(tile.__dict__)
+            copied.position = Point(tile.position.x, tile.position.y)
+            flat[i] = copied
+      clone.bottom_left_corner = Point(self.bottom_left_corner.x,
+                                       self.bottom_left_corner.y)
+      return clone
+
    # Method for moving the tetromino in a given direction by 1 on the game grid
    def move(self, direction, game_grid):
       # check if the tetromino can be moved in the given direction by using the
@@ -152,50 +238,36 @@ class Tetromino:
                   break  # end the inner for loop
       return True  # tetromino can be moved in the given direction
 
-   def rotateTetromino(self):
-      if self.type == "I":
-         if not(self.rotatedBefore):
-            for i in range(1,4):
-               if not(self.tile_matrix[i][0].canBeMoved(Point(-1*i,i))):
-                  return
-            for i in range(1,4):
-               self.tile_matrix[i][0].move(-1*i, i)
-            for i in range(1,4):
-               self.tile_matrix[0][i] = self.tile_matrix[i][0]
-               self.tile_matrix[i][0] = None
-            self.bottom_left_corner = self.tile_matrix[0][0].get_position()
-            if self.bottom_left_corner == None:
-               print("Rip")
-            self.rotatedBefore = True
-         else:
-            for i in range(1,4):
-               self.tile_matrix[0][i].move(i,-1*i)
-            for i in range(1,4):
-               self.tile_matrix[i][0] = self.tile_matrix[0][i]
-               self.tile_matrix[0][i] = None
-            self.rotatedBefore = False
-      if self.type == "Z":
-         if not(self.rotatedBefore):
-            self.tile_matrix[0][0].move(2,0)
-            self.tile_matrix[0][1].move(1,1)
-            self.tile_matrix[1][2].move(-1,1)
-            self.rotatedBefore = True
-         else:
-            self.tile_matrix[0][0].move(-2,0)
-            self.tile_matrix[0][1].move(-1,-1)
-            self.tile_matrix[1][2].move(1,-1)
-            self.rotatedBefore = False
-
-   
-      
-      
-               
-
-
-
-            
-            
-            
-
-
-
+   # Method for rotating the tetromino 90 degrees clockwise inside its n x n
+   # tile matrix; four turns bring every shape back to its original matrix
+   def rotateTetromino(self, game_grid=None):
+      n = len(self.tile_matrix)  # n = number of rows = number of columns
+      # the tile at (row, col) of the matrix moves to (col, n - 1 - row)
+      rotated = np.full((n, n), None)
+      for row in range(n):
+         for col in range(n):
+            if self.tile_matrix[row][col] is not None:
+               rotated[col][n - 1 - row] = self.tile_matrix[row][col]
+      # check the new position of each tile before moving any of them
+      for row in range(n):
+         for col in range(n):
+            if rotated[row][col] is not None:
+               x = self.bottom_left_corner.x + col
+               y = self.bottom_left_corner.y + (n - 1) - row
+               # tetromino cannot rotate out of the sides or the bottom
+               if x < 0 or x >= self.grid_width or y < 0:
+                  return False
+               # or onto an occupied grid cell
+               if game_grid is not None and game_grid.is_occupied(y, x):
+                  return False
+      # move each tile to its new position and replace the tile matrix
+      for row in range(n):
+         for col in range(n):
+            tile = rotated[row][col]
+            if tile is not None:
+               tile.move(self.bottom_left_corner.x + col - tile.position.x,
+                         self.bottom_left_corner.y + (n - 1) - row
+                         - tile.position.y)
+      self.tile_matrix = rotated
+      self.rotation = (self.rotation + 1) % 4
+      return True  # successful rotation
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+tournament.py
+
+Policy tournament with common random numbers: every policy plays the
+same seeds, so each seed yields one paired difference per pair of
+policies and the piece-sequence luck cancels out. Games run in batches
+across worker processes; after each batch every pair is tested on the
+mean paired score difference (paired Student t-test), and the tournament
+stops as soon as all pairs are resolved, but never before min_games
+seeds. The significance level is split evenly over the pairs and over
+the planned looks (Bonferroni), so peeking after every batch does not
+inflate the false-positive rate.
+
+    python tournament.py random greedy --batch 50 --max-games 1000
+"""
+import argparse
+import itertools
+import math
+import multiprocessing as mp
+import statistics
+import time
+
+import game_config
+from simulate import POLICIES, play
+
+METRICS = (('score', 'score'), ('max_tile', 'max tile'),
+           ('steps', 'survival (steps)'))
+MIN_GAMES = 30     # seeds played before a look may stop the tournament
+
+
+# ─── Statistics ─────────────────────────────────────────────────────────────
+def _betacf(a, b, x):
+    """Continued fraction of the incomplete beta function (modified Lentz)."""
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        for aa in (m * (b - m) * x / ((a + 2*m - 1) * (a + 2*m)),
+                   -(a + m) * (a + b + m) * x / ((a + 2*m) * (a + 2*m + 1))):
+            d = 1.0 + aa * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + aa / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1.0) < 1e-14:
+            break
+    return h
+
+
+def _betainc(a, b, x):
+    """Regularized incomplete beta function I_x(a, b)."""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                     + a * math.log(x) + b * math.log1p(-x))
+    if x < (a + 1) / (a + b + 2):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+
+def t_pvalue(t, df):
+    """Two-sided p-value of Student's t with df degrees of freedom."""
+    return _betainc(df / 2, 0.5, df / (df + t * t))
+
+
+def _t(confidence, df):
+    """Two-sided critical value of Student's t, by bisection."""
+    lo, hi = 0.0, 1e6
+    for _ in range(200):
+        mid = (lo + hi) / 2
+        if t_pvalue(mid, df) > 1 - confidence:
+            lo = mid
+        else:
+            hi = mid
+    return hi
+
+
+def summarize(xs, confidence=0.95):
+    """Mean with a Student-t CI, plus distribution quantiles."""
+    n = len(xs)
+    mean = statistics.fmean(xs)
+    sd = statistics.stdev(xs) if n > 1 else 0.0
+    half = _t(confidence, n - 1) * sd / math.sqrt(n) if n > 1 else math.inf
+    q = statistics.quantiles(xs, n=10) if n > 1 else [xs[0]] * 9
+    return {'n': n, 'mean': mean, 'sd': sd, 'ci': (mean - half, mean + half),
+            'p10': q[0], 'median': statistics.median(xs), 'p90': q[-1]}
+
+
+def paired_test(a, b):
+    """
+    Two-sided paired t-test of mean(a - b) == 0; returns (mean
+    difference, its standard error, p-value) with n - 1 degrees of
+    freedom, which stays valid at the small n of early looks.
+    """
+    d = [x - y for x, y in zip(a, b)]
+    n = len(d)
+    mean = statistics.fmean(d)
+    if n < 2:
+        return mean, math.inf, 1.0
+    se = statistics.stdev(d) / math.sqrt(n)
+    if se == 0:
+        return mean, se, 1.0 if mean == 0 else 0.0
+    return mean, se, t_pvalue(mean / se, n - 1)
+
+
+# ─── Games ──────────────────────────────────────────────────────────────────
+def _play(args):
+    policy, seed, config = args
+    return policy, seed, play(policy, seed, config)
+
+
+def tournament(policies, config=None, first_seed=0, batch=50, max_games=1000,
+               alpha=0.05, workers=0, log=print, min_games=MIN_GAMES):
+    """
+    Play `policies` on common seeds until every pair is resolved (after
+    at least min_games seeds) or max_games seeds were used. Looks before
+    min_games are only progress reports, but they still get their share
+    of alpha. Returns (results, tests, threshold):
+    results maps policy -> seed -> record, tests maps (a, b) -> (diff,
+    se, p), and threshold is the per-look p-value needed to resolve.
+    """
+    pairs = list(itertools.combinations(policies, 2))
+    looks = math.ceil(max_games / batch)
+    threshold = alpha / (len(pairs) * looks)
+    results = {p: {} for p in policies}
+    tests = {}
+    pool = mp.Pool(workers) if workers > 0 else None
+    try:
+        imap = pool.imap_unordered if pool else map
+        seed = first_seed
+        for look in range(1, looks + 1):
+            n = min(batch, first_seed + max_games - seed)
+            jobs = [(p, s, config) for s in range(seed, seed + n)
+                    for p in policies]
+            seed += n
+            for policy, s, record in imap(_play, jobs):
+                results[policy][s] = record
+            seeds = sorted(results[policies[0]])
+            for a, b in pairs:
+                tests[(a, b)] = paired_test(
+                    [results[a][s]['score'] for s in seeds],
+                    [results[b][s]['score'] for s in seeds])
+            resolved = sum(p < threshold for _, _, p in tests.values())
+            log(f"look {look}/{looks}: {len(seeds)} seeds, "
+                f"{resolved}/{len(pairs)} pairs resolved")
+            if resolved == len(pairs) and len(seeds) >= min_games:
+                break
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    return results, tests, threshold
+
+
+def report(results, tests, threshold, confidence=0.95):
+    for key, label in METRICS:
+        print(f"\n{label}")
+        print(f"  {'policy':10s} {'mean':>10s} {'95% CI':>23s} "
+              f"{'p10':>9s} {'median':>9s} {'p90':>9s}")
+        for policy, games in results.items():
+            s = summarize([g[key] for g in games.values()], confidence)
+            lo, hi = s['ci']
+            print(f"  {policy:10s} {s['mean']:10.1f} "
+                  f"[{lo:10.1f}, {hi:10.1f}] {s['p10']:9.1f} "
+                  f"{s['median']:9.1f} {s['p90']:9.1f}")
+    print(f"\npaired score differences (resolved at p < {threshold:.2g})")
+    n = len(next(iter(results.values())))
+    t = _t(confidence, n - 1) if n > 1 else math.inf
+    for (a, b), (diff, se, p) in tests.items():
+        verdict = 'resolved' if p < threshold else 'unresolved'
+        print(f"  {a} - {b}: {diff:+.1f} "
+              f"[{diff - t*se:+.1f}, {diff + t*se:+.1f}]  p={p:.3g}  {verdict}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tetris 2048 policy tournament')
+    game_config.add_arguments(parser)
+    parser.add_argument('policies', nargs='+', choices=sorted(POLICIES))
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--batch', type=int, default=50,
+                        help='seeds played between two looks')
+    parser.add_argument('--max-games', type=int, default=1000,
+                        help='seeds per policy at most')
+    parser.add_argument('--min-games', type=int, default=MIN_GAMES,
+                        help='seeds per policy before stopping early')
+    parser.add_argument('--alpha', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, default=mp.cpu_count())
+    args = parser.parse_args()
+    if len(set(args.policies)) < 2:
+        parser.error('at least two different policies are needed')
+
+    t0 = time.perf_counter()
+    results, tests, threshold = tournament(
+        list(dict.fromkeys(args.policies)), game_config.from_args(args),
+        args.first_seed, args.batch, args.max_games, args.alpha, args.workers,
+        min_games=args.min_games)
+    report(results, tests, threshold)
+    print(f"\n{time.perf_counter() - t0:.1f}s")
+
+if __name__ == '__main__':
+    main()